@@ -0,0 +1,72 @@
+"""
+专栏正文提取耗时对比：BeautifulSoup(html.parser) 全树遍历 vs lxml 定位正文容器并按上限截断。
+
+用法:
+    python scripts/bench_article_extract.py                  # 使用合成的专栏页面
+    python scripts/bench_article_extract.py page.html [...]  # 使用保存下来的专栏页面（浏览器“另存为”即可）
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'services'))
+
+from bs4 import BeautifulSoup  # noqa: E402
+import bili_service  # noqa: E402
+
+
+def extract_soup(page):
+    # 旧实现：html.parser 解析整页，get_text 遍历全部文本后再截断
+    soup = BeautifulSoup(page, 'html.parser')
+    holder = soup.find(class_='article-holder') or soup.find(id='read-article-holder') or soup.find(class_='opus-module-content')
+    root = holder or soup
+    for script in root(["script", "style"]):
+        script.extract()
+    html_content = root.decode_contents()
+    summary = root.get_text(separator='\n', strip=True)
+    return summary[:bili_service.ARTICLE_SUMMARY_LIMIT], html_content
+
+
+def extract_lxml(page):
+    return bili_service._extract_article(page)
+
+
+def synthetic_page(paragraphs=3000):
+    noise = ''.join(f'<li><a href="/v/{i}">推荐视频 {i}</a></li>' for i in range(800))
+    body = ''.join(
+        f'<p style="text-align: left">第 {i} 段正文，包含<strong>加粗</strong>与<a href="https://b23.tv/{i}">链接</a>。'
+        f'{"这是一段用于测试的专栏正文内容。" * 4}</p>'
+        + (f'<figure><img data-src="//i0.hdslb.com/bfs/article/{i}.jpg"/></figure>' if i % 10 == 0 else '')
+        for i in range(paragraphs)
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>cv</title>'
+        f'<script>window.__INITIAL_STATE__={{"x":"{"a" * 200000}"}}</script><style>.a{{color:red}}</style></head>'
+        f'<body><div class="nav"><ul>{noise}</ul></div>'
+        f'<div id="read-article-holder" class="article-holder">{body}</div>'
+        f'<div class="footer"><ul>{noise}</ul></div></body></html>'
+    ).encode('utf-8')
+
+
+def bench(name, page, rounds):
+    print(f"{name}: {len(page)} bytes, {rounds} rounds")
+    for label, fn in (('bs4 html.parser', extract_soup), ('lxml targeted', extract_lxml)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            summary, html_content = fn(page)
+        ms = (time.perf_counter() - start) / rounds * 1000
+        print(f"  {label:<16} {ms:9.2f} ms/page  summary={len(summary):>5} chars  html_content={len(html_content):>8} chars")
+
+
+def main():
+    paths = sys.argv[1:]
+    if not paths:
+        bench('synthetic article page', synthetic_page(), 5)
+        return
+    for path in paths:
+        with open(path, 'rb') as f:
+            bench(path, f.read(), 5)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,417 @@
+"""
+bili_service 各命令的离线基准测试：不访问网络，所有上游请求由本地替身服务按 fixtures 中的合成响应回放。
+
+fixtures/bili_api.json 是按接口结构手写的合成数据（bench_* 标题、up_N 作者、占位的 buvid 等），
+只保证各命令能走完整条处理路径，字段与体积不代表真实接口的返回；测得的数字用于同一套 fixtures 下
+不同提交之间的对比，而不是线上耗时。需要真实的响应结构时用 --record 重新生成。
+
+共享 HTTP 会话（bilibili_api 的请求也经过它）在发出请求前把 https://<host>/<path> 改写为
+http://127.0.0.1:<port>/<host>/<path>，替身服务按 "<host>/<path>" 在 fixtures/bili_api.json 中查找响应，
+图片域名（*.hdslb.com）返回合成的 JPEG。找不到对应响应的请求返回 404 并计入 unmatched。
+
+每个命令统计：
+  p50/p95/mean 延迟（同一进程内多轮，每轮前清空各级缓存，关闭响应缓存与限流）、
+  上游请求次数与下载字节数（每轮）、内存分配（tracemalloc 峰值与净分配块数）、
+  冷启动耗时（新进程导入模块并执行一次命令的总耗时）。
+结果以 JSON 输出，可保存后与其他提交的结果对比。
+
+用法:
+    python scripts/bench_commands.py [--rounds 20] [--cold 3] [--out result.json] [命令 ...]
+    python scripts/bench_commands.py --compare base.json result.json [--threshold 0.2]
+    python scripts/bench_commands.py --record [命令 ...]   # 访问真实接口，用真实响应覆盖 fixtures 中的同名条目（需要网络与 data/cookies.json）
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SERVICE_DIR = os.path.join(ROOT, 'src', 'services')
+FIXTURE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bili_api.json')
+sys.path.insert(0, SERVICE_DIR)
+
+IMPORT_START = time.perf_counter()
+import bili_service  # noqa: E402
+IMPORT_MS = (time.perf_counter() - IMPORT_START) * 1000
+
+from aiohttp import web  # noqa: E402
+from PIL import Image, ImageDraw  # noqa: E402
+from yarl import URL  # noqa: E402
+
+# 命令 -> 参数（与命令行调用一致）；ID 对应 fixtures 中的合成数据
+COMMAND_ARGS = {
+    "video": ["BV1GJ411x7h7"],
+    "bangumi": ["33415"],
+    "article": ["cv19736513"],
+    "live_room": ["21452505"],
+    "login_url": [],
+    "login_check": ["8a2f3c9d1e4b5a6c7d8e9f0a1b2c3d4e"],
+    "user_dynamic": ["546195"],
+    "user_dynamic_batch": [json.dumps([{"uid": "546195"}, {"uid": "546195", "last_ts": "1700000000"}])],
+    "feed_poll": [],
+    "user_live": ["546195"],
+    "live_status_batch": [json.dumps([{"uid": "546195"}, {"uid": "2"}])],
+    "dynamic_detail": ["915171683226501129"],
+    "opus": ["915171683226501129"],
+    "ep": ["374717"],
+    "media": ["28229233"],
+    "user_info": ["546195"],
+    "user_card": ["546195"],
+    "my_followings": [],
+    "followings_diff": [],
+    "image_palette": ["https://i0.hdslb.com/bfs/archive/bench_cover.jpg"],
+}
+
+
+def synthetic_jpeg(width=960, height=540):
+    img = Image.new('RGB', (width, height), (30, 60, 90))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, width, 40):
+        draw.rectangle((i, 0, i + 20, height), fill=((i * 7) % 256, (i * 3) % 256, 160))
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=85)
+    return buf.getvalue()
+
+
+class StandIn:
+    """按 "<host>/<path>" 回放 fixtures 中响应的本地服务，统计请求次数与响应字节数。"""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.image = synthetic_jpeg()
+        self.calls = 0
+        self.bytes = 0
+        self.unmatched = []
+
+    def reset(self):
+        self.calls = 0
+        self.bytes = 0
+        self.unmatched = []
+
+    def lookup(self, route):
+        if route in self.fixtures:
+            return self.fixtures[route]
+        # 以 * 结尾的键按前缀匹配（如页面地址中带 ID 的部分）
+        for key, value in self.fixtures.items():
+            if key.endswith('*') and route.startswith(key[:-1]):
+                return value
+        return None
+
+    async def handle(self, request):
+        host = request.match_info['host']
+        route = f"{host}/{request.match_info['path']}"
+        self.calls += 1
+        if host.endswith('hdslb.com'):
+            body, content_type, status = self.image, 'image/jpeg', 200
+        else:
+            fixture = self.lookup(route)
+            if fixture is None:
+                self.unmatched.append(route)
+                body, content_type, status = b'{"code":-404,"message":"no fixture","data":null}', 'application/json', 404
+            elif isinstance(fixture, dict) and '__html__' in fixture:
+                body, content_type, status = fixture['__html__'].encode('utf-8'), 'text/html', 200
+            else:
+                body = json.dumps(fixture, ensure_ascii=False).encode('utf-8')
+                content_type, status = 'application/json', 200
+        self.bytes += len(body)
+        return web.Response(body=body, status=status, content_type=content_type, charset='utf-8' if content_type != 'image/jpeg' else None)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route('*', '/{host}/{path:.*}', self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def install_transport(port):
+    # 注入到共享会话：所有外部地址改写到本地替身服务
+    session = bili_service.get_http_session()
+    send = session._request
+
+    def request(method, str_or_url, **kwargs):
+        url = URL(str_or_url)
+        if url.host and url.host != '127.0.0.1':
+            url = URL.build(scheme='http', host='127.0.0.1', port=port, path=f'/{url.host}{url.path}', query=url.query)
+        return send(method, url, **kwargs)
+
+    session._request = request
+
+
+def install_recorder(recorded):
+    # 录制模式：请求照常发出，按 "<host>/<path>" 保存最后一次响应
+    session = bili_service.get_http_session()
+    send = session._request
+
+    async def request(method, str_or_url, **kwargs):
+        resp = await send(method, str_or_url, **kwargs)
+        url = URL(str_or_url)
+        if url.host and not url.host.endswith('hdslb.com') and resp.status == 200:
+            body = await resp.read()
+            route = f'{url.host}{url.path}'
+            try:
+                recorded[route] = json.loads(body)
+            except ValueError:
+                recorded[route] = {"__html__": body.decode('utf-8', errors='replace')}
+        return resp
+
+    session._request = request
+
+
+def isolate_state(tmp):
+    # 缓存数据库与凭据指向临时目录，不影响 data/ 下的真实数据
+    bili_service.CACHE_DB_FILE = os.path.join(tmp, 'bili_cache.db')
+    bili_service.CREDENTIAL_FILE = os.path.join(tmp, 'cookies.json')
+    bili_service.GROUP_COOKIES_MAP_FILE = os.path.join(tmp, 'cookies_map.json')
+    with open(bili_service.CREDENTIAL_FILE, 'w') as f:
+        json.dump({"SESSDATA": "bench", "BILI_JCT": "bench", "BUVID3": "bench"}, f)
+    bili_service.RESPONSE_CACHE_ENABLED = False
+    bili_service.RATE_LIMIT_ENABLED = False
+
+
+def reset_caches():
+    for cache in bili_service.CACHES.values():
+        cache._memory.clear()
+        conn = cache._db()
+        if conn is not None:
+            conn.execute(f'DELETE FROM {cache.table}')
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+async def run_command_quiet(command, args):
+    # 命令内部打印到 stderr 的错误堆栈不混入基准输出
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stderr(devnull):
+        return await bili_service.run_command(command, args)
+
+
+async def run_once(command, args):
+    reset_caches()
+    start = time.perf_counter()
+    result = await run_command_quiet(command, args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def bench_command(server, command, args, rounds):
+    latencies = []
+    calls = []
+    sizes = []
+    status = None
+    unmatched = set()
+    # 第一轮仅预热（bilibili_api 首次请求会取 buvid/wbi 等），不计入统计
+    server.reset()
+    await run_once(command, args)
+    unmatched.update(server.unmatched)
+    for _ in range(rounds):
+        server.reset()
+        ms, result = await run_once(command, args)
+        latencies.append(ms)
+        calls.append(server.calls)
+        sizes.append(server.bytes)
+        unmatched.update(server.unmatched)
+        status = result.get('status') if isinstance(result, dict) else None
+
+    reset_caches()
+    tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    await run_command_quiet(command, args)
+    blocks_after = sys.getallocatedblocks()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "status": status,
+        "rounds": rounds,
+        "p50_ms": round(percentile(latencies, 0.5), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "upstream_calls": int(statistics.median(calls)),
+        "bytes_fetched": int(statistics.median(sizes)),
+        "alloc_peak_kb": round(peak / 1024, 1),
+        "alloc_net_blocks": blocks_after - blocks_before,
+        "unmatched": sorted(unmatched),
+    }
+
+
+def cold_start(port, command, args, runs):
+    times = []
+    child = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', str(port), command, *args],
+            capture_output=True, text=True,
+        )
+        times.append((time.perf_counter() - start) * 1000)
+        if proc.returncode == 0 and proc.stdout.strip():
+            child = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "cold_start_ms": round(statistics.median(times), 1) if times else None,
+        "import_ms": child.get('import_ms') if child else None,
+        "cold_status": child.get('status') if child else None,
+    }
+
+
+async def child_main(port, command, args):
+    # 冷启动子进程：导入、连接替身服务、执行一次命令后退出
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_state(tmp)
+        install_transport(port)
+        start = time.perf_counter()
+        result = await run_command_quiet(command, args)
+        run_ms = (time.perf_counter() - start) * 1000
+        await bili_service.close_http_session()
+    print(json.dumps({"import_ms": round(IMPORT_MS, 1), "run_ms": round(run_ms, 1), "status": result.get('status')}))
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_fixtures():
+    with open(FIXTURE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def bench_main(opts):
+    commands = opts.commands or list(COMMAND_ARGS)
+    server = StandIn(load_fixtures())
+    port = await server.start()
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_state(tmp)
+        install_transport(port)
+        try:
+            for command in commands:
+                args = COMMAND_ARGS[command]
+                stats = await bench_command(server, command, args, opts.rounds)
+                if opts.cold:
+                    loop = asyncio.get_running_loop()
+                    stats.update(await loop.run_in_executor(None, cold_start, port, command, args, opts.cold))
+                results[command] = stats
+                print(f"{command:<20} {stats['status'] or '-':<8} p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  "
+                      f"{stats['upstream_calls']:>3} calls {stats['bytes_fetched']:>8} B  peak {stats['alloc_peak_kb']:>8.1f} KB  "
+                      f"cold {stats.get('cold_start_ms') or '-':>7} ms"
+                      + (f"  unmatched: {', '.join(stats['unmatched'])}" if stats['unmatched'] else ''),
+                      file=sys.stderr)
+        finally:
+            await bili_service.close_http_session()
+            await server.stop()
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": int(time.time()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rounds": opts.rounds,
+            "cold_runs": opts.cold,
+            "import_ms": round(IMPORT_MS, 1),
+        },
+        "commands": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if opts.out:
+        with open(opts.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+async def record_main(opts):
+    commands = opts.commands or list(COMMAND_ARGS)
+    recorded = {}
+    install_recorder(recorded)
+    try:
+        for command in commands:
+            result = await bili_service.run_command(command, COMMAND_ARGS[command])
+            print(f"{command:<20} {result.get('status')}", file=sys.stderr)
+    finally:
+        await bili_service.close_http_session()
+    fixtures = load_fixtures() if os.path.exists(FIXTURE_FILE) else {}
+    fixtures.update(recorded)
+    with open(FIXTURE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(fixtures, f, ensure_ascii=False, indent=1)
+    print(f"recorded {len(recorded)} responses into {FIXTURE_FILE}", file=sys.stderr)
+
+
+COMPARE_METRICS = ("p50_ms", "p95_ms", "upstream_calls", "bytes_fetched", "alloc_peak_kb", "cold_start_ms")
+
+
+def compare(base_path, head_path, threshold):
+    with open(base_path, encoding='utf-8') as f:
+        base = json.load(f)
+    with open(head_path, encoding='utf-8') as f:
+        head = json.load(f)
+    regressions = []
+    print(f"{base['meta'].get('revision')} -> {head['meta'].get('revision')}")
+    for command, after in head['commands'].items():
+        before = base['commands'].get(command)
+        if not before:
+            continue
+        cells = []
+        for metric in COMPARE_METRICS:
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else (0.0 if new == old else float('inf'))
+            cells.append(f"{metric} {old}->{new} ({change:+.0%})")
+            if change > threshold:
+                regressions.append((command, metric, change))
+        print(f"{command:<20} " + '  '.join(cells))
+    for command, metric, change in regressions:
+        print(f"REGRESSION {command} {metric} {change:+.0%}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        port, command, args = int(sys.argv[2]), sys.argv[3], sys.argv[4:]
+        asyncio.run(child_main(port, command, args))
+        return
+
+    parser = argparse.ArgumentParser(description='bili_service offline command benchmarks')
+    parser.add_argument('commands', nargs='*', help='commands to run (default: all)')
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--cold', type=int, default=3, help='cold-start runs per command (0 to skip)')
+    parser.add_argument('--out', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--record', action='store_true', help='record live responses into the fixture file')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='compare two JSON reports')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative increase reported as a regression')
+    opts = parser.parse_args()
+
+    if opts.compare:
+        sys.exit(compare(opts.compare[0], opts.compare[1], opts.threshold))
+    unknown = [c for c in opts.commands if c not in COMMAND_ARGS]
+    if unknown:
+        parser.error(f"unknown command(s): {', '.join(unknown)}")
+    if opts.record:
+        asyncio.run(record_main(opts))
+    else:
+        asyncio.run(bench_main(opts))
+
+
+if __name__ == '__main__':
+    main()
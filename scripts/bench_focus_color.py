@@ -0,0 +1,111 @@
+"""
+主色提取的一致性校验与性能对比。
+
+在固定的合成图片集上分别运行纯 Python 实现 (_choose_focus_color_py) 与 numpy 实现 (_choose_focus_color)，
+两者结果不一致（包括同分颜色的取舍）或调色板首色与主色不一致时以非零状态退出。
+
+用法: python scripts/bench_focus_color.py [--rounds 20]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'services'))
+
+from PIL import Image, ImageDraw  # noqa: E402
+import bili_service  # noqa: E402
+
+
+def build_corpus():
+    rng = random.Random(20240101)
+    corpus = {}
+
+    corpus['solid_red'] = Image.new('RGB', (320, 200), (220, 40, 40))
+    corpus['solid_gray'] = Image.new('RGB', (320, 200), (128, 128, 128))
+    corpus['solid_black'] = Image.new('RGB', (320, 200), (5, 5, 5))
+
+    grad = Image.new('RGB', (512, 288))
+    grad.putdata([(x % 256, (x * y) % 256, y % 256) for y in range(288) for x in range(512)])
+    corpus['gradient'] = grad
+
+    noise = Image.new('RGB', (400, 400))
+    noise.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(400 * 400)])
+    corpus['noise'] = noise
+
+    dark_noise = Image.new('RGB', (300, 300))
+    dark_noise.putdata([(rng.randrange(40), rng.randrange(40), rng.randrange(40)) for _ in range(300 * 300)])
+    corpus['dark_noise'] = dark_noise
+
+    gray_noise = Image.new('L', (300, 300))
+    gray_noise.putdata([rng.randrange(256) for _ in range(300 * 300)])
+    corpus['grayscale'] = gray_noise
+
+    for i in range(5):
+        blobs = Image.new('RGB', (640, 360), tuple(rng.randrange(256) for _ in range(3)))
+        draw = ImageDraw.Draw(blobs)
+        for _ in range(40):
+            x0, y0 = rng.randrange(640), rng.randrange(360)
+            x1, y1 = x0 + rng.randrange(20, 200), y0 + rng.randrange(20, 200)
+            draw.ellipse((x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3)))
+        corpus[f'blobs_{i}'] = blobs
+
+    avatar = Image.new('RGBA', (128, 128), (0, 0, 0, 0))
+    ImageDraw.Draw(avatar).ellipse((8, 8, 120, 120), fill=(250, 114, 152, 255))
+    corpus['rgba_avatar'] = avatar
+
+    # 同分：两种（或四种）颜色的饱和度、明度与像素数都相同，检查两种实现取同一个
+    halves = Image.new('RGB', (320, 200), (200, 0, 0))
+    halves.paste((0, 0, 200), (160, 0, 320, 200))
+    corpus['tie_halves'] = halves
+    quads = Image.new('RGB', (256, 256), (0, 180, 0))
+    quads.paste((180, 0, 0), (128, 0, 256, 128))
+    quads.paste((0, 0, 180), (0, 128, 128, 256))
+    quads.paste((180, 0, 180), (128, 128, 256, 256))
+    corpus['tie_quads'] = quads
+
+    corpus['palette_mode'] = corpus['blobs_0'].convert('P', palette=Image.ADAPTIVE, colors=64)
+    return corpus
+
+
+def timed(fn, img, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn(img)
+    return result, (time.perf_counter() - start) / rounds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+
+    if bili_service._numpy() is None:
+        print('numpy 未安装，无法对比向量化实现')
+        return 1
+
+    mismatches = 0
+    total_py = total_np = 0.0
+    print(f"{'image':<14} {'python':>9} {'numpy':>9} {'py ms':>8} {'np ms':>8}  palette")
+    for name, img in build_corpus().items():
+        expected, py_ms = timed(bili_service._choose_focus_color_py, img, args.rounds)
+        actual, np_ms = timed(bili_service._choose_focus_color, img, args.rounds)
+        palette = bili_service._choose_focus_palette(img, 3)
+        total_py += py_ms
+        total_np += np_ms
+        # 调色板的第一个颜色应与主色一致
+        mismatch = expected != actual or palette[0] != actual
+        flag = '  MISMATCH' if mismatch else ''
+        mismatches += mismatch
+        print(f"{name:<14} {expected:>9} {actual:>9} {py_ms:>8.3f} {np_ms:>8.3f}  {','.join(palette)}{flag}")
+
+    print(f"total: python {total_py:.3f} ms, numpy {total_np:.3f} ms")
+    if mismatches:
+        print(f'{mismatches} mismatch(es)')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+关注列表分页拉取的耗时对比：逐页串行 vs 第一页取总数后并发拉取，以及流式输出的首条记录延迟。
+
+在本地启动一个模拟 x/relation/followings 的 HTTP 服务（每次请求带固定延迟），
+get_my_followings 中的 bilibili_api 调用被替换为请求该本地服务，不访问真实接口。
+
+用法:
+    python scripts/bench_followings.py [总关注数] [单次请求延迟毫秒]     # 默认 2000 人、80 ms
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'services'))
+
+from aiohttp import web  # noqa: E402
+import bili_service  # noqa: E402
+
+
+def make_app(total, delay):
+    stats = {'requests': 0}
+
+    async def followings(request):
+        stats['requests'] += 1
+        await asyncio.sleep(delay)
+        pn = int(request.query.get('pn', 1))
+        ps = int(request.query.get('ps', 50))
+        start = (pn - 1) * ps
+        users = [
+            {'mid': 10000 + i, 'uname': f'up_{i}', 'face': f'https://i0.hdslb.com/bfs/face/{i}.jpg', 'sign': 'x' * 40}
+            for i in range(start, min(start + ps, total))
+        ]
+        return web.json_response({'code': 0, 'data': {'list': users, 'total': total, 're_version': 1}})
+
+    app = web.Application()
+    app.router.add_get('/x/relation/followings', followings)
+    return app, stats
+
+
+def patch_bilibili_api(base_url):
+    async def get_self_info(credential=None):
+        return {'mid': 1}
+
+    async def get_followings(self, pn=1, ps=50, **kwargs):
+        session = bili_service.get_http_session()
+        async with session.get(f'{base_url}/x/relation/followings', params={'pn': pn, 'ps': ps}) as resp:
+            return (await resp.json())['data']
+
+    bili_service.user.get_self_info = get_self_info
+    bili_service.user.User.get_followings = get_followings
+    bili_service.load_credential = lambda group_id=None: bili_service.bilibili_api.Credential(sessdata='bench')
+
+
+async def run_case(name, stats, concurrency, streaming):
+    bili_service.FOLLOWINGS_CONCURRENCY = concurrency
+    first = None
+    records = 0
+
+    async def emit(item):
+        nonlocal first, records
+        if first is None:
+            first = time.perf_counter()
+        records += 1
+
+    bili_service._stream_emit.set(emit if streaming else None)
+    stats['requests'] = 0
+    start = time.perf_counter()
+    result = await bili_service.get_my_followings(None, None, '1' if streaming else None)
+    elapsed = time.perf_counter() - start
+    if not streaming:
+        records = len(result['data'])
+        first = time.perf_counter()
+    first_ms = (first - start) * 1000 if first else 0
+    print(f"  {name:<28} {elapsed * 1000:9.1f} ms total  {first_ms:9.1f} ms to first record  "
+          f"{records:>6} records  {stats['requests']:>4} requests")
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = (int(sys.argv[2]) if len(sys.argv) > 2 else 80) / 1000
+
+    app, stats = make_app(total, delay)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    patch_bilibili_api(f'http://127.0.0.1:{port}')
+
+    print(f"{total} followings, {bili_service.FOLLOWINGS_PAGE_SIZE} per page, {delay * 1000:.0f} ms per request")
+    try:
+        await run_case('sequential (concurrency=1)', stats, 1, False)
+        await run_case('concurrent (concurrency=4)', stats, 4, False)
+        await run_case('concurrent + stream', stats, 4, True)
+    finally:
+        await bili_service.close_http_session()
+        await runner.cleanup()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
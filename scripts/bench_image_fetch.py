@@ -0,0 +1,87 @@
+"""
+主色取色路径的下载量与耗时对比：原图全尺寸下载解码 vs 缩略图/降采样解码。
+
+用法:
+    python scripts/bench_image_fetch.py                      # 离线：仅对比本地合成 JPEG 的解码耗时
+    python scripts/bench_image_fetch.py URL [URL ...]        # 在线：对比真实图片的下载字节数与耗时
+"""
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'services'))
+
+from PIL import Image, ImageDraw  # noqa: E402
+import bili_service  # noqa: E402
+
+
+def decode_full(data):
+    return bili_service._choose_focus_color(Image.open(io.BytesIO(data)))
+
+
+def decode_sample(data):
+    return bili_service._choose_focus_color(bili_service._open_sample_image(data))
+
+
+def synthetic_jpeg(width=1920, height=1080):
+    img = Image.new('RGB', (width, height), (30, 60, 90))
+    draw = ImageDraw.Draw(img)
+    for i in range(0, width, 40):
+        draw.rectangle((i, 0, i + 20, height), fill=((i * 7) % 256, (i * 3) % 256, 160))
+    buf = io.BytesIO()
+    img.save(buf, 'JPEG', quality=90)
+    return buf.getvalue()
+
+
+def bench_offline(rounds=20):
+    data = synthetic_jpeg()
+    print(f"synthetic 1920x1080 JPEG, {len(data)} bytes, {rounds} rounds")
+    for name, fn in (('full decode', decode_full), ('draft decode', decode_sample)):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            color = fn(data)
+        ms = (time.perf_counter() - start) / rounds * 1000
+        print(f"  {name:<14} {ms:8.2f} ms/image  color={color}")
+
+
+async def bench_online(urls):
+    print(f"{'mode':<10} {'bytes':>10} {'ms':>9}  color  url")
+    totals = {'before': [0, 0.0], 'after': [0, 0.0]}
+    try:
+        for url in urls:
+            start = time.perf_counter()
+            data = await bili_service._fetch_bytes(url)
+            color = decode_full(data) if data else None
+            ms = (time.perf_counter() - start) * 1000
+            totals['before'][0] += len(data)
+            totals['before'][1] += ms
+            print(f"{'before':<10} {len(data):>10} {ms:>9.1f}  {color}  {url}")
+
+            start = time.perf_counter()
+            data = await bili_service._fetch_sample_bytes(url)
+            color = decode_sample(data) if data else None
+            ms = (time.perf_counter() - start) * 1000
+            totals['after'][0] += len(data)
+            totals['after'][1] += ms
+            print(f"{'after':<10} {len(data):>10} {ms:>9.1f}  {color}  {bili_service._thumbnail_url(url) or url}")
+    finally:
+        await bili_service.close_http_session()
+
+    count = max(len(urls), 1)
+    for mode, (size, ms) in totals.items():
+        print(f"{mode:<10} avg {size / count:>10.0f} bytes {ms / count:>9.1f} ms per image")
+
+
+def main():
+    urls = sys.argv[1:]
+    if urls:
+        asyncio.run(bench_online(urls))
+    else:
+        bench_offline()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
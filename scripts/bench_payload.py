@@ -0,0 +1,163 @@
+"""
+Python → Node 管道的负载对比：默认 json.dumps vs 紧凑分隔符 / orjson，以及 fields=render 投影后的大小。
+
+对每类命令的合成结果（结构参照真实接口返回）统计：编码后字节数、Python 编码耗时、
+Python json.loads 与 Node JSON.parse 的解析耗时（找不到 node 时跳过）。
+
+用法:
+    python scripts/bench_payload.py [轮数]     # 默认 200 轮
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'services'))
+
+import bili_service  # noqa: E402
+
+
+def rich_text(n):
+    return {
+        "text": "正文内容 " * n,
+        "rich_text_nodes": [
+            {"orig_text": f"片段{i}", "text": f"片段{i}", "type": "RICH_TEXT_NODE_TYPE_TEXT"} for i in range(n)
+        ] + [{"orig_text": "@某人", "rid": "123", "text": "@某人", "type": "RICH_TEXT_NODE_TYPE_AT"}],
+    }
+
+
+def dynamic_item(idx, with_orig=True):
+    item = {
+        "basic": {"comment_id_str": str(idx), "comment_type": 11, "like_icon": {"action_url": "https://i0.hdslb.com/bfs/garb/item/a.bin", "end_url": "", "id": 0, "start_url": ""}, "rid_str": str(idx)},
+        "id_str": str(900000000000000000 + idx),
+        "type": "DYNAMIC_TYPE_DRAW",
+        "visible": True,
+        "modules": {
+            "module_author": {
+                "face": "https://i0.hdslb.com/bfs/face/a.jpg", "mid": 12345, "name": "UP主", "pub_ts": 1700000000 + idx,
+                "pub_time": "2小时前", "pub_action": "", "jump_url": "//space.bilibili.com/12345/dynamic",
+                "pendant": {"image": "https://i0.hdslb.com/bfs/garb/pendant.png", "name": "挂件", "pid": 1},
+                "decoration_card": {"card_url": "https://i0.hdslb.com/bfs/garb/card.png", "fan": {"color": "#ff7373", "num_desc": "000123"}, "id": 1},
+                "official_verify": {"desc": "", "type": -1}, "vip": {"status": 1, "type": 2, "label": {"text": "年度大会员", "path": "", "img_label_uri_hans": "https://i0.hdslb.com/bfs/vip/label.png"}},
+            },
+            "module_dynamic": {
+                "additional": None,
+                "desc": rich_text(30),
+                "major": {"type": "MAJOR_TYPE_DRAW", "draw": {"id": idx, "items": [{"height": 1080, "width": 1920, "size": 345.6, "src": f"https://i0.hdslb.com/bfs/new_dyn/{i}.jpg", "tags": []} for i in range(9)]}},
+                "topic": None,
+            },
+            "module_interaction": {"items": [{"desc": rich_text(10), "type": 1}]},
+            "module_more": {"three_point_items": [{"label": "举报", "type": "THREE_POINT_REPORT"}, {"label": "收藏", "type": "THREE_POINT_FAV", "params": {"dynamic_id": str(idx), "status": False}}]},
+            "module_stat": {"comment": {"count": 123, "forbidden": False}, "forward": {"count": 45, "forbidden": False}, "like": {"count": 6789, "forbidden": False, "status": False}},
+            "module_fold": {"ids": [str(idx + i) for i in range(20)], "statement": "展开20条相关动态"},
+        },
+    }
+    if with_orig:
+        item["orig"] = dynamic_item(idx + 1, with_orig=False)
+        item["type"] = "DYNAMIC_TYPE_FORWARD"
+    return item
+
+
+def enriched_author():
+    return {"level": 6, "pendant_url": "https://i0.hdslb.com/bfs/garb/pendant.png", "card_url": "https://i0.hdslb.com/bfs/garb/card.png",
+            "decoration_card": {"card_url": "https://i0.hdslb.com/bfs/garb/card.png"}, "card_number": "000123", "card_focus_color": "#aabbcc",
+            "fan_color": "#ff7373", "avatar_focus_color": "#112233"}
+
+
+def fixtures():
+    raw = dynamic_item(1)
+    user_dynamic_data = {"id": raw["id_str"], "type": raw["type"], "modules": raw["modules"], "orig": raw["orig"], "pub_ts": 1700000001, "author": enriched_author()}
+    detail = {"item": dict(raw, author=enriched_author()), "author": enriched_author()}
+    article_info = {
+        "id": 1, "mid": 12345, "title": "专栏标题", "author_name": "UP主", "author_face": "https://i0.hdslb.com/bfs/face/a.jpg",
+        "publish_time": 1700000000, "summary": "正文" * 1250, "html_content": "<p>正文段落内容</p>" * 1200,
+        "stats": {"view": 1, "favorite": 2, "like": 3, "dislike": 0, "reply": 4, "share": 5, "coin": 6, "dynamic": 0},
+        "focus": {"cover": "#aabbcc", "avatar": "#112233"},
+        "category": {"id": 2, "name": "动画", "parent_id": 1}, "categories": [{"id": 1, "name": "动画"}] * 2,
+        "tags": [{"tid": i, "name": f"标签{i}"} for i in range(20)], "image_urls": [f"https://i0.hdslb.com/bfs/article/{i}.jpg" for i in range(10)],
+        "origin_image_urls": [f"https://i0.hdslb.com/bfs/article/{i}.jpg" for i in range(10)], "media": {"score": 0}, "list": None,
+        "author": {"mid": 12345, "name": "UP主", "face": "https://i0.hdslb.com/bfs/face/a.jpg", "pendant": {}, "official_verify": {}, "nameplate": {}, "vip": {}},
+    }
+    feed = {"unchanged": False, "initialized": False, "count": 6,
+            "authors": {str(mid): [dict(user_dynamic_data) for _ in range(2)] for mid in range(3)}}
+    return [
+        ("dynamic_detail", {"status": "success", "type": "dynamic", "data": detail}),
+        ("user_dynamic", {"status": "success", "data": user_dynamic_data}),
+        ("article", {"status": "success", "type": "article", "data": article_info}),
+        ("feed_poll", {"status": "success", "type": "feed_poll", "data": feed}),
+    ]
+
+
+def encoders():
+    yield 'json default', lambda obj: json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    yield 'json compact', lambda obj: json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if bili_service.orjson is not None:
+        yield 'orjson', lambda obj: bili_service.orjson.dumps(obj, option=bili_service.orjson.OPT_NON_STR_KEYS)
+
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        value = fn()
+    return value, (time.perf_counter() - start) / rounds * 1000
+
+
+NODE_PARSE = """
+const fs = require('fs');
+const rounds = Number(process.argv[1]);
+const out = {};
+for (const file of process.argv.slice(2)) {
+    const text = fs.readFileSync(file, 'utf8');
+    const start = process.hrtime.bigint();
+    for (let i = 0; i < rounds; i++) JSON.parse(text);
+    out[file] = Number(process.hrtime.bigint() - start) / 1e6 / rounds;
+}
+console.log(JSON.stringify(out));
+"""
+
+
+def node_parse_times(payloads, rounds):
+    node = shutil.which('node')
+    if not node:
+        return {}
+    with tempfile.TemporaryDirectory() as tmp:
+        files = {}
+        for key, data in payloads.items():
+            path = os.path.join(tmp, f'{len(files)}.json')
+            with open(path, 'wb') as f:
+                f.write(data)
+            files[path] = key
+        proc = subprocess.run([node, '-e', NODE_PARSE, str(rounds), *files], capture_output=True, text=True)
+        if proc.returncode != 0:
+            return {}
+        return {files[path]: ms for path, ms in json.loads(proc.stdout).items()}
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{rounds} rounds, orjson {'available' if bili_service.orjson is not None else 'not installed'}")
+    rows = []
+    payloads = {}
+    for command, result in fixtures():
+        spec = bili_service._projection_for(command, result, 'render')
+        projected = bili_service._project(result, spec)
+        for variant, obj in (('full', result), ('render', projected)):
+            for name, encode in encoders():
+                data, encode_ms = timed(lambda: encode(obj), rounds)
+                _, loads_ms = timed(lambda: json.loads(data), rounds)
+                key = (command, variant, name)
+                payloads[key] = data
+                rows.append((key, len(data), encode_ms, loads_ms))
+
+    node_ms = node_parse_times(payloads, rounds)
+    print(f"{'command':<15} {'fields':<7} {'encoder':<13} {'bytes':>9} {'encode ms':>10} {'py parse ms':>12} {'node parse ms':>14}")
+    for key, size, encode_ms, loads_ms in rows:
+        node = f"{node_ms[key]:14.3f}" if key in node_ms else f"{'-':>14}"
+        print(f"{key[0]:<15} {key[1]:<7} {key[2]:<13} {size:>9} {encode_ms:>10.3f} {loads_ms:>12.3f} {node}")
+
+
+if __name__ == '__main__':
+    main()
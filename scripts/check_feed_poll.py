@@ -0,0 +1,124 @@
+"""
+关注动态流轮询（feed_poll）的基线推进校验。
+
+用本地模拟的动态流替换 bilibili_api 的 update 接口与分页接口，按顺序执行：
+  1. 首次轮询：只记录基线（initialized）；
+  2. 新动态超过页数上限：返回 truncated，但基线推进到最新动态；
+  3. 之后只有少量新动态：正常返回这些动态，不再截断；
+  4. 没有新动态：unchanged。
+任一步结果不符时以状态码 1 退出。不访问网络。
+
+用法: python scripts/check_feed_poll.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPTS_DIR, '..', 'src', 'services'))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import bili_service  # noqa: E402
+from check_startup import isolate_state  # noqa: E402
+
+PAGE_SIZE = 10
+
+
+class Feed:
+    """按 ID 递增发布的动态流，最新的在前。"""
+
+    def __init__(self):
+        self.items = []
+        self.page_requests = 0
+
+    def publish(self, count, mid=1000):
+        start = len(self.items) + 1
+        for dynamic_id in range(start, start + count):
+            self.items.insert(0, {
+                "id_str": str(dynamic_id),
+                "modules": {"module_author": {"mid": mid, "pub_ts": dynamic_id}},
+            })
+
+    def update_num(self, baseline):
+        return sum(1 for item in self.items if int(item['id_str']) > int(baseline))
+
+    def page(self, pn):
+        self.page_requests += 1
+        start = (pn - 1) * PAGE_SIZE
+        items = self.items[start:start + PAGE_SIZE]
+        return {
+            "items": items,
+            "has_more": start + PAGE_SIZE < len(self.items),
+            "offset": items[-1]['id_str'] if items else None,
+            "update_baseline": self.items[0]['id_str'] if self.items and pn == 1 else None,
+        }
+
+
+def install_feed(feed):
+    class Api:
+        def __init__(self, url, method="GET", credential=None):
+            self.params = {}
+
+        def update_params(self, **params):
+            self.params.update(params)
+
+        @property
+        def result(self):
+            async def fetch():
+                return {"update_num": feed.update_num(self.params['update_baseline'])}
+            return fetch()
+
+    async def get_dynamic_page_info(credential, _type=None, pn=1, offset=None):
+        return feed.page(pn)
+
+    async def enrich(item, uid, credential):
+        return {"id": item['id_str']}
+
+    bili_service.bili_network = SimpleNamespace(Api=Api)
+    bili_service.dynamic = SimpleNamespace(get_dynamic_page_info=get_dynamic_page_info, DynamicType=SimpleNamespace(ALL="all"))
+    bili_service._enrich_user_dynamic = enrich
+    bili_service.load_credential = lambda group_id=None: SimpleNamespace(sessdata='check')
+
+
+async def run_steps(feed):
+    failures = []
+
+    def expect(step, data, **expected):
+        actual = {key: data.get(key) for key in expected}
+        ok = actual == expected
+        print(f"{'ok  ' if ok else 'FAIL'} {step}: {actual}")
+        if not ok:
+            failures.append(step)
+
+    feed.publish(5)
+    res = await bili_service.get_feed_poll(max_pages=2)
+    expect("first poll", res['data'], initialized=True, count=0)
+
+    feed.publish(3 * PAGE_SIZE)
+    res = await bili_service.get_feed_poll(max_pages=2)
+    expect("backlog beyond page limit", res['data'], truncated=True, count=0)
+
+    feed.publish(2)
+    feed.page_requests = 0
+    res = await bili_service.get_feed_poll(max_pages=2)
+    expect("poll after truncation", res['data'], truncated=None, initialized=False, count=2)
+    expect("pages after truncation", {"page_requests": feed.page_requests}, page_requests=1)
+
+    res = await bili_service.get_feed_poll(max_pages=2)
+    expect("no new dynamics", res['data'], unchanged=True, count=0)
+    return failures
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        isolate_state(bili_service, tmp)
+        feed = Feed()
+        install_feed(feed)
+        failures = asyncio.run(run_steps(feed))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
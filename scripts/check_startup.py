@@ -0,0 +1,216 @@
+"""
+bili_service 冷启动预算检查：按命令在新进程中用 python -X importtime 执行一次，统计导入耗时并检查加载了哪些重量级模块。
+
+Node 以一次性进程方式调用时，每条命令都要付出完整的导入开销；bili_service 的依赖
+（bilibili_api/aiohttp/PIL/lxml/numpy）都是按需加载的，这里确保：
+  - 统计类命令不加载任何重量级模块；
+  - image_palette 不加载 bilibili_api；
+  - 命中响应缓存的命令（先执行一次预热）同样不加载任何重量级模块；
+  - 每个用例的导入总耗时（importtime self 列之和）不超过预算。
+上游请求由 bench_commands.py 的本地替身服务按合成的 fixtures 回放，不访问网络。
+
+用法:
+    python scripts/check_startup.py [--scale 1.5] [--json] [用例 ...]
+超出预算或加载了禁止的模块时以状态码 1 退出。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVICE_DIR = os.path.join(SCRIPTS_DIR, '..', 'src', 'services')
+
+HEAVY_MODULES = ('bilibili_api', 'aiohttp', 'PIL', 'lxml', 'numpy')
+
+# 用例名 -> (命令, 参数, 导入预算 ms, 禁止加载的模块, 是否先预热响应缓存)
+CASES = {
+    "cache_stats": ("cache_stats", [], 200, HEAVY_MODULES, False),
+    "limiter_stats": ("limiter_stats", [], 200, HEAVY_MODULES, False),
+    "response_cache_stats": ("response_cache_stats", [], 200, HEAVY_MODULES, False),
+    "video (cached)": ("video", ["BV1GJ411x7h7"], 200, HEAVY_MODULES, True),
+    "live_room (cached)": ("live_room", ["21452505"], 200, HEAVY_MODULES, True),
+    "image_palette": ("image_palette", ["https://i0.hdslb.com/bfs/archive/bench_cover.jpg"], 600, ('bilibili_api', 'lxml'), False),
+    "video": ("video", ["BV1GJ411x7h7"], 1500, (), False),
+    "live_room": ("live_room", ["21452505"], 1500, (), False),
+    "article": ("article", ["cv19736513"], 1500, (), False),
+    "user_dynamic": ("user_dynamic", ["546195"], 1500, (), False),
+    "user_live": ("user_live", ["546195"], 1500, (), False),
+    "login_check": ("login_check", ["8a2f3c9d1e4b5a6c7d8e9f0a1b2c3d4e"], 1500, (), False),
+}
+
+
+def install_transport(bili_service, port):
+    # 子进程不主动导入 aiohttp：包装 get_http_session，在会话首次创建时把外部地址改写到替身服务
+    create = bili_service.get_http_session
+    patched = set()
+
+    def get_http_session():
+        session = create()
+        if id(session) not in patched:
+            from yarl import URL
+            send = session._request
+
+            def request(method, str_or_url, **kwargs):
+                url = URL(str_or_url)
+                if url.host and url.host != '127.0.0.1':
+                    url = URL.build(scheme='http', host='127.0.0.1', port=port, path=f'/{url.host}{url.path}', query=url.query)
+                return send(method, url, **kwargs)
+
+            session._request = request
+            patched.add(id(session))
+        return session
+
+    bili_service.get_http_session = get_http_session
+
+
+def isolate_state(bili_service, tmp):
+    bili_service.CACHE_DB_FILE = os.path.join(tmp, 'bili_cache.db')
+    bili_service.CREDENTIAL_FILE = os.path.join(tmp, 'cookies.json')
+    bili_service.GROUP_COOKIES_MAP_FILE = os.path.join(tmp, 'cookies_map.json')
+    if not os.path.exists(bili_service.CREDENTIAL_FILE):
+        with open(bili_service.CREDENTIAL_FILE, 'w') as f:
+            json.dump({"SESSDATA": "bench", "BILI_JCT": "bench", "BUVID3": "bench"}, f)
+    bili_service.RATE_LIMIT_ENABLED = False
+
+
+def child_main(port, tmp, command, args):
+    # 只导入 bili_service 本身，其余依赖由命令按需加载
+    sys.path.insert(0, SERVICE_DIR)
+    import asyncio
+    import bili_service
+
+    isolate_state(bili_service, tmp)
+    install_transport(bili_service, port)
+
+    async def run():
+        try:
+            return await bili_service.run_command(command, args)
+        finally:
+            await bili_service.close_http_session()
+
+    start = time.perf_counter()
+    result = asyncio.run(run())
+    run_ms = (time.perf_counter() - start) * 1000
+    loaded = sorted(name for name in HEAVY_MODULES if name in sys.modules)
+    print(json.dumps({"status": result.get('status'), "run_ms": round(run_ms, 1), "loaded": loaded}))
+
+
+def parse_importtime(stderr):
+    total_us = 0
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        modules[name.strip()] = int(cumulative_us)
+    return total_us / 1000, modules
+
+
+def run_child(port, tmp, command, args, importtime=True):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += [os.path.abspath(__file__), '--child', str(port), tmp, command, *args]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    lines = proc.stdout.strip().splitlines()
+    child = json.loads(lines[-1]) if proc.returncode == 0 and lines else {}
+    return proc, child, wall_ms
+
+
+def check_case(port, name, runs, scale):
+    command, args, budget_ms, forbidden, prime = CASES[name]
+    samples = []
+    for _ in range(runs):
+        # 每个进程使用全新的缓存目录，否则后续进程会命中前一次写入的响应缓存
+        with tempfile.TemporaryDirectory() as tmp:
+            if prime:
+                run_child(port, tmp, command, args, importtime=False)
+            proc, child, wall_ms = run_child(port, tmp, command, args)
+        import_ms, modules = parse_importtime(proc.stderr)
+        samples.append((import_ms, wall_ms, child, modules))
+
+    import_ms = statistics.median(s[0] for s in samples)
+    wall_ms = statistics.median(s[1] for s in samples)
+    child = samples[-1][2]
+    loaded = child.get('loaded', [])
+    budget = budget_ms * scale
+    violations = []
+    if not child:
+        violations.append("child process failed")
+    if import_ms > budget:
+        violations.append(f"import {import_ms:.0f} ms > budget {budget:.0f} ms")
+    bad = [module for module in loaded if module in forbidden]
+    if bad:
+        violations.append(f"loaded {', '.join(bad)}")
+    return {
+        "command": command,
+        "status": child.get('status'),
+        "import_ms": round(import_ms, 1),
+        "bili_service_ms": round(samples[-1][3].get('bili_service', 0) / 1000, 1),
+        "wall_ms": round(wall_ms, 1),
+        "budget_ms": round(budget, 1),
+        "loaded": loaded,
+        "violations": violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('cases', nargs='*', help='用例名（默认全部）')
+    parser.add_argument('--runs', type=int, default=3, help='每个用例的进程数，取中位数')
+    parser.add_argument('--scale', type=float, default=1.0, help='预算倍数（较慢的机器上放宽）')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    parser.add_argument('--child', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.child:
+        port, tmp, command, *args = opts.child
+        child_main(int(port), tmp, command, args)
+        return 0
+
+    names = opts.cases or list(CASES)
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case: {', '.join(unknown)}")
+
+    # 替身服务在父进程中运行（父进程可以随意导入 aiohttp/PIL）
+    import asyncio
+    import threading
+    sys.path.insert(0, SCRIPTS_DIR)
+    from bench_commands import StandIn, load_fixtures
+
+    loop = asyncio.new_event_loop()
+    server = StandIn(load_fixtures())
+    port = loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    try:
+        results = {name: check_case(port, name, opts.runs, opts.scale) for name in names}
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+
+    failed = [name for name, result in results.items() if result['violations']]
+    if opts.json:
+        print(json.dumps({"results": results, "failed": failed}, ensure_ascii=False, indent=2))
+    else:
+        print(f"{'case':<22} {'status':<8} {'import ms':>10} {'budget':>8} {'wall ms':>9}  loaded")
+        for name, result in results.items():
+            mark = '  FAIL: ' + '; '.join(result['violations']) if result['violations'] else ''
+            print(f"{name:<22} {str(result['status']):<8} {result['import_ms']:>10.1f} {result['budget_ms']:>8.0f} "
+                  f"{result['wall_ms']:>9.1f}  {','.join(result['loaded']) or '-'}{mark}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,7 @@ const logger = require('./utils/logger');
 const messageHandler = require('./handlers/messageHandler');
 const subscriptionService = require('./services/subscriptionService');
 const imageGenerator = require('./services/imageGenerator');
+const biliApi = require('./services/biliApi');
 
 // WebSocket连接管理
 let ws = null;
@@ -120,6 +121,9 @@ async function gracefulShutdown() {
         logger.error('Error cleaning up Puppeteer:', e);
     }
 
+    // 关闭常驻 Python 进程
+    biliApi.stopDaemon();
+
     // 关闭WebSocket连接
     if (ws) {
         try {
@@ -38,7 +38,10 @@ const config = {
     
     // System Paths & Admin
     pythonPath: process.env.PYTHON_PATH || (fs.existsSync(path.join(__dirname, '../venv/bin/python')) ? path.join(__dirname, '../venv/bin/python') : 'python3'),
-    biliScriptPath: './src/services/bili_service.py',
+    // Launcher imports bili_service so the module's bytecode is reused between spawns
+    biliScriptPath: './src/services/bili_cli.py',
+    // Keep one long-lived bili_service.py process (serve mode) instead of spawning per call
+    biliDaemon: process.env.BILI_DAEMON !== 'false',
     adminQQ: process.env.ADMIN_QQ,
     useBase64Send: process.env.USE_BASE64_SEND === 'true',
     // NapCat temporary file path (host path mapped to container)
@@ -9,7 +9,6 @@ const https = require('https');
 const fs = require('fs');
 const path = require('path');
 const config = require('../config');
-const cacheManager = require('../utils/cacheManager');
 
 class MessageHandler {
     constructor() {
@@ -129,23 +128,6 @@ class MessageHandler {
         }
     }
 
-    // Helper to get data with cache
-    async getDataWithCache(type, id, apiCall) {
-        const cacheKey = `${type}_${id}`;
-        let info = await cacheManager.get(cacheKey);
-        
-        if (info) {
-            logger.info(`[MessageHandler] Data cache hit for ${cacheKey}`);
-            return info;
-        }
-
-        info = await apiCall();
-        if (info && info.status === 'success') {
-            await cacheManager.set(cacheKey, info);
-        }
-        return info;
-    }
-
     // 处理单个链接
     async processSingleLink(link, ws, groupId, userId = null) {
         const { type, id, cacheKey } = link;
@@ -156,7 +138,7 @@ class MessageHandler {
             switch (type) {
                 case 'video':
                     logger.info(`[MessageHandler] Processing Bilibili Video: ${id}`);
-                    info = await this.getDataWithCache('video', id, () => biliApi.getVideoInfo(id, groupId));
+                    info = await biliApi.getVideoInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, 'video', groupId);
@@ -175,7 +157,7 @@ class MessageHandler {
 
                 case 'bangumi':
                     logger.info(`[MessageHandler] Processing Bilibili Bangumi: ${id}`);
-                    info = await this.getDataWithCache('bangumi', id, () => biliApi.getBangumiInfo(id, groupId));
+                    info = await biliApi.getBangumiInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, 'bangumi', groupId);
@@ -194,7 +176,7 @@ class MessageHandler {
 
                 case 'dynamic':
                     logger.info(`[MessageHandler] Processing Bilibili Dynamic: ${id}`);
-                    info = await this.getDataWithCache('dynamic', id, () => biliApi.getDynamicInfo(id, groupId));
+                    info = await biliApi.getDynamicInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             // Use returned type if available (e.g., 'article' for Opus redirects), fallback to 'dynamic'
@@ -214,7 +196,7 @@ class MessageHandler {
 
                 case 'article':
                     logger.info(`[MessageHandler] Processing Bilibili Article: ${id}`);
-                    info = await this.getDataWithCache('article', id, () => biliApi.getArticleInfo(id, groupId));
+                    info = await biliApi.getArticleInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, info.type, groupId);
@@ -233,7 +215,7 @@ class MessageHandler {
 
                 case 'live':
                     logger.info(`[MessageHandler] Processing Bilibili Live: ${id}`);
-                    info = await this.getDataWithCache('live', id, () => biliApi.getLiveRoomInfo(id, groupId));
+                    info = await biliApi.getLiveRoomInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, 'live', groupId);
@@ -252,7 +234,7 @@ class MessageHandler {
 
                 case 'opus':
                     logger.info(`[MessageHandler] Processing Bilibili Opus: ${id}`);
-                    info = await this.getDataWithCache('opus', id, () => biliApi.getOpusInfo(id, groupId));
+                    info = await biliApi.getOpusInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, info.type, groupId);
@@ -270,7 +252,7 @@ class MessageHandler {
 
                 case 'ep':
                     logger.info(`[MessageHandler] Processing Bilibili EP: ${id}`);
-                    info = await this.getDataWithCache('ep', id, () => biliApi.getEpInfo(id, groupId));
+                    info = await biliApi.getEpInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, 'bangumi', groupId);
@@ -289,7 +271,7 @@ class MessageHandler {
 
                 case 'media':
                     logger.info(`[MessageHandler] Processing Bilibili Media: ${id}`);
-                    info = await this.getDataWithCache('media', id, () => biliApi.getMediaInfo(id, groupId));
+                    info = await biliApi.getMediaInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             base64Image = await imageGenerator.generatePreviewCard(info, 'bangumi', groupId);
@@ -308,7 +290,7 @@ class MessageHandler {
 
                 case 'user':
                     logger.info(`[MessageHandler] Processing Bilibili User: ${id}`);
-                    info = await this.getDataWithCache('user', id, () => biliApi.getUserInfo(id, groupId));
+                    info = await biliApi.getUserInfo(id, groupId);
                     if (info.status === 'success') {
                         try {
                             const showId = config.getGroupConfig(groupId, 'showId');
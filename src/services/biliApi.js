@@ -2,6 +2,10 @@ const { spawn } = require('child_process');
 const config = require('../config');
 const logger = require('../utils/logger');
 const path = require('path');
+const readline = require('readline');
+
+// 仅用于渲染卡片的结果：让 Python 端按渲染需要的字段裁剪，减少传输与解析量
+const RENDER = { fields: 'render' };
 
 class BiliApi {
     constructor() {
@@ -9,24 +13,178 @@ class BiliApi {
         this.scriptPath = config.biliScriptPath;
         this.retryDelay = 10000; // 10秒重试延迟
         this.maxRetries = 1; // 最多重试1次
+        this.maxRateLimitWait = 60000; // 风控冷却超过 60 秒时不再等待重试
+        this.commandTimeout = 60000; // 单个命令超时 60 秒
+
+        // 常驻 Python 进程（serve 模式），避免每次调用都重新启动解释器
+        this.useDaemon = config.biliDaemon;
+        this.daemon = null;
+        this.pending = new Map(); // id -> { resolve, reject, timeout, command, onItem, resetTimeout }
+        this.nextRequestId = 1;
+        this.daemonRestartDelay = 5000; // 常驻进程异常退出后，5秒内降级为单次调用
+        this.daemonDisabledUntil = 0;
+    }
+
+    /**
+     * 常驻进程当前是否可用（已启动、未退出，且不在异常退出后的降级期内）。
+     * 未启用常驻模式或常驻进程不可用时，命令会以单次进程方式执行
+     * @returns {boolean}
+     */
+    daemonAlive() {
+        return Boolean(this.useDaemon && this.daemon && this.daemon.exitCode === null && !this.daemon.killed
+            && Date.now() >= this.daemonDisabledUntil);
+    }
+
+    /**
+     * 执行 Python 命令
+     * @param {string} command - 命令名称
+     * @param {Array} args - 命令参数
+     * @param {Object} options - 可选项：onItem 接收批量命令逐条返回的结果；input 为通过 stdin 传入的大参数；
+     *                           fields 为结果裁剪方式（'render' 或逗号分隔的字段路径）
+     * @returns {Promise} 命令的最终结果
+     */
+    async runCommand(command, args = [], options = {}) {
+        if (this.useDaemon && Date.now() >= this.daemonDisabledUntil) {
+            try {
+                return await this.runDaemonCommand(command, args, options);
+            } catch (e) {
+                if (!e.daemonFailure) throw e;
+                logger.warn(`[BiliApi] Daemon unavailable for ${command}, falling back to one-shot process: ${e.message}`);
+            }
+        }
+        return this.spawnCommand(command, args, options);
+    }
+
+    startDaemon() {
+        const daemon = spawn(this.pythonPath, [this.scriptPath, 'serve']);
+        this.daemon = daemon;
+
+        const rl = readline.createInterface({ input: daemon.stdout, crlfDelay: Infinity });
+        rl.on('line', (line) => {
+            if (!line.trim()) return;
+            let msg;
+            try {
+                msg = JSON.parse(line);
+            } catch (e) {
+                logger.error('[BiliApi] Failed to parse daemon output:', line.substring(0, 500) + '...');
+                return;
+            }
+            const entry = this.pending.get(msg.id);
+            if (!entry) return;
+            if (msg.item !== undefined) {
+                // 批量命令的中间结果，收到数据即重置超时
+                entry.resetTimeout();
+                if (entry.onItem) entry.onItem(msg.item);
+                return;
+            }
+            this.pending.delete(msg.id);
+            clearTimeout(entry.timeout);
+            entry.resolve(msg.result);
+        });
+
+        daemon.stderr.on('data', (data) => {
+            logger.debug(`[BiliApi] Daemon stderr: ${data.toString().trim()}`);
+        });
+
+        const onExit = (reason) => {
+            if (this.daemon !== daemon) return;
+            this.daemon = null;
+            this.daemonDisabledUntil = Date.now() + this.daemonRestartDelay;
+            logger.warn(`[BiliApi] Python daemon exited (${reason}), ${this.pending.size} pending request(s) will fall back`);
+            for (const [id, entry] of this.pending) {
+                clearTimeout(entry.timeout);
+                const err = new Error(`Python daemon exited (${reason})`);
+                err.daemonFailure = true;
+                entry.reject(err);
+            }
+            this.pending.clear();
+        };
+
+        daemon.on('close', (code, signal) => onExit(signal || `code ${code}`));
+        daemon.on('error', (err) => onExit(err.message));
+        daemon.stdin.on('error', (err) => onExit(err.message));
+
+        logger.info(`[BiliApi] Started Python daemon (pid ${daemon.pid})`);
+        return daemon;
+    }
+
+    runDaemonCommand(command, args = [], options = {}) {
+        return new Promise((resolve, reject) => {
+            const daemon = this.daemon || this.startDaemon();
+            const id = this.nextRequestId++;
+
+            const entry = { resolve, reject, timeout: null, command, onItem: options.onItem };
+            entry.resetTimeout = () => {
+                clearTimeout(entry.timeout);
+                entry.timeout = setTimeout(() => {
+                    this.pending.delete(id);
+                    reject(new Error(`Python script timed out for command: ${command}`));
+                }, this.commandTimeout);
+            };
+            entry.resetTimeout();
+
+            // 常驻模式下没有命令行长度限制，input 直接作为最后一个参数传入
+            const requestArgs = args.map(String);
+            if (options.input !== undefined) requestArgs.push(options.input);
+
+            const request = { id, command, args: requestArgs };
+            if (options.fields) request.fields = options.fields;
+
+            this.pending.set(id, entry);
+            daemon.stdin.write(JSON.stringify(request) + '\n');
+        });
+    }
+
+    stopDaemon() {
+        if (this.daemon) {
+            const daemon = this.daemon;
+            this.daemon = null;
+            daemon.stdin.end();
+        }
     }
 
-    async runCommand(command, args = []) {
+    async spawnCommand(command, args = [], options = {}) {
         return new Promise((resolve, reject) => {
+            // input 通过 stdin 传入（参数为 "-"），避免超出命令行长度限制
             const processArgs = [this.scriptPath, command, ...args];
+            if (options.input !== undefined) processArgs.push('-');
+            if (options.fields) processArgs.push(`--fields=${options.fields}`);
             const pythonProcess = spawn(this.pythonPath, processArgs);
+            if (options.input !== undefined) {
+                pythonProcess.stdin.end(options.input);
+            }
 
-            const chunks = [];
+            const lines = [];
             let errorString = '';
+            let timedOut = false;
+            let timeout = null;
 
-            // Set timeout for Python process (60 seconds)
-            const timeout = setTimeout(() => {
-                pythonProcess.kill();
-                reject(new Error(`Python script timed out for command: ${command}`));
-            }, 60000);
+            // 超时从最近一次输出开始计算：批量命令受限流影响可能持续较久，只要还在逐条输出就不中断
+            const resetTimeout = () => {
+                clearTimeout(timeout);
+                timeout = setTimeout(() => {
+                    timedOut = true;
+                    pythonProcess.kill();
+                    reject(new Error(`Python script timed out for command: ${command}`));
+                }, this.commandTimeout);
+            };
+            resetTimeout();
 
-            pythonProcess.stdout.on('data', (data) => {
-                chunks.push(data);
+            // 输出为 NDJSON：前面每行是一条中间结果，最后一行是最终结果。
+            // 收到下一行时才能确定上一行不是最终结果，此时立即交给 onItem
+            const rl = readline.createInterface({ input: pythonProcess.stdout, crlfDelay: Infinity });
+            rl.on('line', (line) => {
+                if (!line.trim()) return;
+                resetTimeout();
+                if (options.onItem && lines.length > 0 && !timedOut) {
+                    const previous = lines.pop();
+                    try {
+                        options.onItem(JSON.parse(previous));
+                    } catch (e) {
+                        logger.error('Failed to parse Python item output:', previous.substring(0, 500) + '...');
+                    }
+                }
+                lines.push(line);
             });
 
             pythonProcess.stderr.on('data', (data) => {
@@ -35,20 +193,15 @@ class BiliApi {
 
             pythonProcess.on('close', (code) => {
                 clearTimeout(timeout);
+                if (timedOut) return; // Already rejected in timeout
                 if (code !== 0) {
-                    // Check if it was killed by timeout (signal usually SIGTERM or SIGKILL)
-                    if (code === null) {
-                         // Process killed, likely by timeout
-                         return; // Already rejected in timeout
-                    }
                     logger.error(`Python script exited with code ${code}: ${errorString}`);
                     reject(new Error(`Python script exited with code ${code}`));
                     return;
                 }
-                const dataString = Buffer.concat(chunks).toString();
+                const dataString = lines.join('\n');
                 try {
-                    const json = JSON.parse(dataString);
-                    resolve(json);
+                    resolve(JSON.parse(options.onItem ? lines[lines.length - 1] : dataString));
                 } catch (e) {
                     logger.error('Failed to parse Python output:', dataString.substring(0, 500) + '...'); // Log partial output
                     reject(e);
@@ -67,12 +220,21 @@ class BiliApi {
      * @param {string} command - 命令名称
      * @param {Array} args - 命令参数
      * @param {number} retryCount - 当前重试次数（内部使用）
+     * @param {Object} options - 同 runCommand
      * @returns {Promise} 执行结果
      */
-    async runCommandWithRetry(command, args = [], retryCount = 0) {
+    async runCommandWithRetry(command, args = [], retryCount = 0, options = {}) {
         try {
             logger.debug(`Executing command: ${command} (attempt ${retryCount + 1}/${this.maxRetries + 1})`);
-            const result = await this.runCommand(command, args);
+            const result = await this.runCommand(command, args, options);
+
+            // Python 端触发风控冷却：按返回的 retry_after 等待后再试（冷却过长时直接返回错误）
+            if (result && result.rate_limited && retryCount < this.maxRetries
+                && result.retry_after * 1000 <= this.maxRateLimitWait) {
+                logger.warn(`Command ${command} hit risk control, retrying in ${result.retry_after} seconds...`);
+                await new Promise(resolve => setTimeout(resolve, result.retry_after * 1000));
+                return this.runCommandWithRetry(command, args, retryCount + 1, options);
+            }
 
             // 成功执行，返回结果
             if (retryCount > 0) {
@@ -87,7 +249,7 @@ class BiliApi {
 
                 // 等待后重试
                 await new Promise(resolve => setTimeout(resolve, this.retryDelay));
-                return this.runCommandWithRetry(command, args, retryCount + 1);
+                return this.runCommandWithRetry(command, args, retryCount + 1, options);
             } else {
                 // 已达到最大重试次数，记录错误并抛出
                 logger.error(`Command ${command} failed after ${this.maxRetries + 1} attempts: ${error.message}`);
@@ -112,10 +274,49 @@ class BiliApi {
         return this.runCommand('login_check', args);
     }
 
-    async getUserDynamic(uid, groupId) {
+    /**
+     * 获取 UP 最新动态
+     * @param {string} uid - UP 的 UID
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @param {string} lastId - 上次已处理的动态 ID（可选）
+     * @param {number} lastTime - 上次已处理的动态时间戳（可选）
+     * @returns {Promise} 没有新动态时 data.unchanged 为 true；有多条新动态时 data.items 从旧到新排列
+     */
+    async getUserDynamic(uid, groupId, lastId, lastTime) {
         const args = [uid];
+        if (groupId || lastId) args.push(groupId || '');
+        if (lastId) args.push(lastId, lastTime || '');
+        return this.runCommandWithRetry('user_dynamic', args, 0, RENDER);
+    }
+
+    /**
+     * 批量检查多个 UP 的最新动态，每个 UID 完成后回调 onItem({ uid, result })
+     * @param {Array} items - [{ uid, group_id, last_id, last_ts }]
+     * @param {Function} onItem - 逐条结果回调
+     * @returns {Promise} 汇总结果 { status, data: { count, errors } }
+     */
+    async getUserDynamicBatch(items, onItem) {
+        return this.runCommand('user_dynamic_batch', [], { ...RENDER, input: JSON.stringify(items), onItem });
+    }
+
+    /**
+     * 轮询凭据账号的关注动态流，返回上次轮询后的新动态（按作者 mid 分组）
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @returns {Promise} { status, data: { authors: { mid: [dynamic] }, unchanged?, initialized? } }
+     */
+    async feedPoll(groupId) {
+        const args = [];
         if (groupId) args.push(groupId);
-        return this.runCommandWithRetry('user_dynamic', args);
+        return this.runCommand('feed_poll', args, RENDER);
+    }
+
+    /**
+     * 批量获取多个 UP 的直播状态
+     * @param {Array} uids - UID 列表
+     * @returns {Promise} { status, data: { rooms: { uid: { room_id, live_status, title } }, failed: [uid] } }
+     */
+    async getLiveStatusBatch(uids) {
+        return this.runCommand('live_status_batch', [], { input: JSON.stringify(uids.map(String)) });
     }
 
     async getUserLive(uid, groupId) {
@@ -127,31 +328,47 @@ class BiliApi {
     async getDynamicInfo(dynamicId, groupId) {
         const args = [dynamicId];
         if (groupId) args.push(groupId);
-        return this.runCommandWithRetry('dynamic_detail', args);
+        return this.runCommandWithRetry('dynamic_detail', args, 0, RENDER);
     }
 
     async getArticleInfo(cvid, groupId) {
         const args = [cvid];
         if (groupId) args.push(groupId);
-        return this.runCommand('article', args);
+        return this.runCommand('article', args, RENDER);
     }
 
-    async getBangumiInfo(seasonId, groupId) {
+    /**
+     * 获取番剧信息
+     * @param {string} seasonId - 季度 ID
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @param {number} maxAge - 概览的最长缓存时间 (秒)，订阅检查传 0 以获取最新的 new_ep
+     * @returns {Promise} 番剧信息
+     */
+    async getBangumiInfo(seasonId, groupId, maxAge) {
         const args = [seasonId];
-        if (groupId) args.push(groupId);
+        if (groupId || maxAge !== undefined) args.push(groupId || '');
+        if (maxAge !== undefined) args.push(String(maxAge));
         return this.runCommandWithRetry('bangumi', args);
     }
 
-    async getLiveRoomInfo(roomId, groupId) {
+    /**
+     * 获取直播间信息
+     * @param {string} roomId - 直播间 ID
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @param {number} maxAge - 可接受的最长缓存时间 (秒)，开播通知传 0 以获取最新的标题、封面和直播状态
+     * @returns {Promise} 直播间信息
+     */
+    async getLiveRoomInfo(roomId, groupId, maxAge) {
         const args = [roomId];
-        if (groupId) args.push(groupId);
+        if (groupId || maxAge !== undefined) args.push(groupId || '');
+        if (maxAge !== undefined) args.push(String(maxAge));
         return this.runCommandWithRetry('live_room', args);
     }
 
     async getOpusInfo(opusId, groupId) {
         const args = [opusId];
         if (groupId) args.push(groupId);
-        return this.runCommand('opus', args);
+        return this.runCommand('opus', args, RENDER);
     }
 
     async getUserInfo(uid, groupId) {
@@ -178,7 +395,25 @@ class BiliApi {
         return this.runCommand('media', args);
     }
 
-    async getMyFollowings(groupName, groupId) {
+    /**
+     * 与上次同步的快照比较，获取关注列表的增量变化
+     * @param {string} groupName - B 站关注分组名（可选）
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @returns {Promise} { status, data: { unchanged, initial, added: [user], removed: [uid], total } }
+     */
+    async getFollowingsDiff(groupName, groupId) {
+        const args = [groupName || "None"];
+        if (groupId) args.push(groupId);
+        return this.runCommandWithRetry('followings_diff', args);
+    }
+
+    /**
+     * 获取凭据账号的关注列表
+     * @param {string} groupName - B 站关注分组名（可选）
+     * @param {string} groupId - 群号（用于选择凭据）
+     * @param {Function} onItem - 可选，传入时每条 { uid, name, face, sign } 逐条回调，最终结果的 data 只包含数量
+     */
+    async getMyFollowings(groupName, groupId, onItem) {
         const args = [];
         if (groupName) {
             args.push(groupName);
@@ -192,6 +427,12 @@ class BiliApi {
             }
         }
         if (groupId) args.push(groupId);
+        if (onItem) {
+            if (!groupName && !groupId) args.push("None");
+            if (!groupId) args.push("");
+            args.push("1");
+            return this.runCommandWithRetry('my_followings', args, 0, { onItem });
+        }
         return this.runCommandWithRetry('my_followings', args);
     }
 }
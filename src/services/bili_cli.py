@@ -0,0 +1,12 @@
+"""
+bili_service 的命令行入口（Node 通过它启动 Python 进程）。
+
+直接运行 bili_service.py 时脚本本身不会被缓存为 .pyc，每次启动都要重新编译整个文件；
+经由本入口导入 bili_service 则复用 __pycache__ 中的字节码。
+"""
+import asyncio
+
+import bili_service
+
+if __name__ == "__main__":
+    asyncio.run(bili_service.main())
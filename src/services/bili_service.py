@@ -2,33 +2,144 @@ import sys
 import json
 import asyncio
 import re
-import aiohttp
-from bs4 import BeautifulSoup
-from bilibili_api import video, bangumi, user, article, live, dynamic, show, topic, opus, Credential
-from bilibili_api.utils.network import Api
-import bilibili_api.login_v2 as login
+import importlib
+import html as html_lib
 import io
-from PIL import Image
 import colorsys
+import time
+import sqlite3
+import contextvars
+from collections import OrderedDict
+
+try:
+    # 可选的更快 JSON 编码器（每次输出都会用到，直接导入）
+    import orjson
+except ImportError:
+    orjson = None
+
+# 按需导入：单次调用模式下 Node 每次请求都启动新进程，bilibili_api、aiohttp、PIL、lxml 的导入占冷启动的大部分，
+# 只有实际用到它们的命令才付出这部分开销（统计命令、响应缓存命中等无需任何网络库）
+class _LazyModule:
+    """首次访问属性时才导入的模块代理，on_load 在导入完成后调用一次。"""
+
+    def __init__(self, name, on_load=None):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+        object.__setattr__(self, '_on_load', on_load)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+            if self._on_load is not None:
+                self._on_load()
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+def _on_bilibili_api_load():
+    _init_bilibili_api()
+
+def _on_pil_load():
+    from PIL import ImageFile
+    # 下载被截断的图片仍可用于取色
+    ImageFile.LOAD_TRUNCATED_IMAGES = True
+
+# bilibili_api 的包初始化会导入它的全部子模块，首次访问下面任意一个即加载整个包
+bilibili_api = _LazyModule('bilibili_api', _on_bilibili_api_load)
+bili_network = _LazyModule('bilibili_api.utils.network', _on_bilibili_api_load)
+bili_exceptions = _LazyModule('bilibili_api.exceptions', _on_bilibili_api_load)
+video = _LazyModule('bilibili_api.video', _on_bilibili_api_load)
+bangumi = _LazyModule('bilibili_api.bangumi', _on_bilibili_api_load)
+user = _LazyModule('bilibili_api.user', _on_bilibili_api_load)
+article = _LazyModule('bilibili_api.article', _on_bilibili_api_load)
+live = _LazyModule('bilibili_api.live', _on_bilibili_api_load)
+dynamic = _LazyModule('bilibili_api.dynamic', _on_bilibili_api_load)
+opus = _LazyModule('bilibili_api.opus', _on_bilibili_api_load)
+vote = _LazyModule('bilibili_api.vote', _on_bilibili_api_load)
+login = _LazyModule('bilibili_api.login_v2', _on_bilibili_api_load)
+aiohttp = _LazyModule('aiohttp')
+lxml_html = _LazyModule('lxml.html')
+Image = _LazyModule('PIL.Image', _on_pil_load)
+
+_np = False  # False 表示尚未尝试导入
+
+def _numpy():
+    # numpy 不可用时返回 None，取色退回逐颜色的纯 Python 实现
+    global _np
+    if _np is False:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+    return _np
+
+def preload_modules():
+    # 常驻模式启动时一次性导入全部依赖，避免第一个请求承担导入耗时
+    for module in (bilibili_api, aiohttp, lxml_html, Image):
+        module._load()
+    _numpy()
 
 # Load credentials from a file if they exist
 CREDENTIAL_FILE = 'data/cookies.json'
 GROUP_COOKIES_MAP_FILE = 'data/cookies_map.json'
 
+# 常驻模式下单行请求的最大长度（批量命令可能携带较多参数）
+STREAM_LIMIT = 16 * 1024 * 1024
+
 import os
 
+# 凭据注册表：每个 cookie 文件只解析一次，文件 mtime/大小变化时才重新读取
+# 常驻模式下避免每个请求重复读文件，单次调用模式下也能去掉同一请求内的重复读取
+_json_file_cache = {}   # path -> ((mtime_ns, size), data)
+_credential_registry = {}   # path -> ((mtime_ns, size), Credential)
+
+def _file_signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+def _load_json_cached(path):
+    # 文件不存在时抛出 FileNotFoundError，由调用方决定默认值
+    signature = _file_signature(path)
+    cached = _json_file_cache.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    with open(path, 'r') as f:
+        data = json.load(f)
+    _json_file_cache[path] = (signature, data)
+    return data
+
+def _write_json_atomic(path, data, **kwargs):
+    # 先写临时文件再替换，读取方不会看到写了一半的文件
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **kwargs)
+    os.replace(tmp_path, path)
+    _json_file_cache[path] = (_file_signature(path), data)
+
+def _load_cookies_map():
+    try:
+        mapping = _load_json_cached(GROUP_COOKIES_MAP_FILE)
+        return mapping if isinstance(mapping, dict) else {}
+    except:
+        return {}
+
 def get_credential_file(group_id=None):
     if not group_id:
         return CREDENTIAL_FILE
     
     # Try to load mapping
-    mapping = {}
-    try:
-        if os.path.exists(GROUP_COOKIES_MAP_FILE):
-            with open(GROUP_COOKIES_MAP_FILE, 'r') as f:
-                mapping = json.load(f)
-    except:
-        pass
+    mapping = _load_cookies_map()
         
     group_key = str(group_id)
     if group_key in mapping:
@@ -37,14 +148,27 @@ def get_credential_file(group_id=None):
     # Default to group specific file
     return f'data/cookies_{group_key}.json'
 
+def _credential_from_data(data):
+    return bilibili_api.Credential(sessdata=data.get('SESSDATA'), bili_jct=data.get('BILI_JCT'), buvid3=data.get('BUVID3'))
+
 def load_credential(group_id=None):
     file_path = get_credential_file(group_id)
+    try:
+        signature = _file_signature(file_path)
+    except FileNotFoundError:
+        _credential_registry.pop(file_path, None)
+        return None
+    cached = _credential_registry.get(file_path)
+    if cached and cached[0] == signature:
+        return cached[1]
     try:
         with open(file_path, 'r') as f:
             data = json.load(f)
-            return Credential(sessdata=data.get('SESSDATA'), bili_jct=data.get('BILI_JCT'), buvid3=data.get('BUVID3'))
     except FileNotFoundError:
         return None
+    credential = _credential_from_data(data)
+    _credential_registry[file_path] = (signature, credential)
+    return credential
 
 def save_credential(credential, group_id=None):
     # Determine target file
@@ -53,37 +177,505 @@ def save_credential(credential, group_id=None):
         target_file = f'data/cookies_{group_key}.json'
         
         # Update mapping
-        mapping = {}
-        try:
-            if os.path.exists(GROUP_COOKIES_MAP_FILE):
-                with open(GROUP_COOKIES_MAP_FILE, 'r') as f:
-                    mapping = json.load(f)
-        except:
-            pass
-            
-        mapping[group_key] = target_file
-        with open(GROUP_COOKIES_MAP_FILE, 'w') as f:
-            json.dump(mapping, f, indent=4)
+        mapping = dict(_load_cookies_map())
+        if mapping.get(group_key) != target_file:
+            mapping[group_key] = target_file
+            _write_json_atomic(GROUP_COOKIES_MAP_FILE, mapping, indent=4)
     else:
         target_file = CREDENTIAL_FILE
 
-    with open(target_file, 'w') as f:
-        json.dump({
-            'SESSDATA': credential.sessdata,
-            'BILI_JCT': credential.bili_jct,
-            'BUVID3': credential.buvid3
-        }, f)
+    data = {
+        'SESSDATA': credential.sessdata,
+        'BILI_JCT': credential.bili_jct,
+        'BUVID3': credential.buvid3
+    }
+    _write_json_atomic(target_file, data)
+    # 文件替换完成后再更新注册表，后续请求直接拿到新凭据
+    _credential_registry[target_file] = (_file_signature(target_file), _credential_from_data(data))
+
+# 两级缓存：进程内 LRU + SQLite 持久化（单次调用模式下也能跨进程复用）
+CACHE_DB_FILE = 'data/bili_cache.db'
+
+_cache_db = None
+_cache_db_failed = False
+CACHES = {}
+
+def _get_cache_db():
+    global _cache_db, _cache_db_failed
+    if _cache_db is None and not _cache_db_failed:
+        try:
+            os.makedirs(os.path.dirname(CACHE_DB_FILE), exist_ok=True)
+            conn = sqlite3.connect(CACHE_DB_FILE, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            _cache_db = conn
+        except sqlite3.Error:
+            # 磁盘不可用时只使用内存缓存
+            _cache_db_failed = True
+    return _cache_db
+
+class TwoTierCache:
+    """
+    内存 LRU + SQLite 表的键值缓存。
+    值以 JSON 存储；超过 ttl 秒的条目视为未命中；内存与磁盘分别按条目数上限淘汰最旧的数据。
+    """
+
+    def __init__(self, name, ttl, max_memory=1024, max_disk=50000):
+        self.name = name
+        self.table = f'cache_{name}'
+        self.ttl = ttl
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._memory = OrderedDict()  # key -> (value, stored_at)
+        self._table_ready = False
+        self._writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def _db(self):
+        conn = _get_cache_db()
+        if conn is not None and not self._table_ready:
+            try:
+                conn.execute(f'CREATE TABLE IF NOT EXISTS {self.table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)')
+                conn.execute(f'CREATE INDEX IF NOT EXISTS {self.table}_stored_at ON {self.table} (stored_at)')
+                self._table_ready = True
+            except sqlite3.Error:
+                return None
+        return conn if self._table_ready else None
+
+    def _remember(self, key, value, stored_at):
+        self._memory[key] = (value, stored_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key):
+        # 返回 (value, stored_at)，调用方可据此判断条目新旧
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if now - entry[1] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+            del self._memory[key]
+
+        conn = self._db()
+        if conn is not None:
+            try:
+                row = conn.execute(f'SELECT value, stored_at FROM {self.table} WHERE key = ?', (key,)).fetchone()
+            except sqlite3.Error:
+                row = None
+            if row and now - row[1] < self.ttl:
+                value = json.loads(row[0])
+                self._remember(key, value, row[1])
+                self.disk_hits += 1
+                return (value, row[1])
+
+        self.misses += 1
+        return None
 
-async def _fetch_bytes(url: str) -> bytes:
+    def set(self, key, value):
+        now = time.time()
+        self._remember(key, value, now)
+        conn = self._db()
+        if conn is None:
+            return
+        try:
+            conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, value, stored_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now)
+            )
+            self._writes += 1
+            # 首次写入及此后每 100 次写入检查一次磁盘容量
+            if self._writes % 100 == 1:
+                self._evict_disk(conn, now)
+        except sqlite3.Error:
+            pass
+
+    def _evict_disk(self, conn, now):
+        cur = conn.execute(f'DELETE FROM {self.table} WHERE stored_at < ?', (now - self.ttl,))
+        self.evictions += max(cur.rowcount, 0)
+        count = conn.execute(f'SELECT COUNT(*) FROM {self.table}').fetchone()[0]
+        if count > self.max_disk:
+            cur = conn.execute(
+                f'DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table} ORDER BY stored_at ASC LIMIT ?)',
+                (count - self.max_disk,)
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+    def stale_keys(self, max_age, limit=50):
+        # 返回磁盘中存放时间超过 max_age 但尚未过期的键（最旧的优先），供后台刷新使用
+        conn = self._db()
+        if conn is None:
+            return []
+        now = time.time()
+        try:
+            rows = conn.execute(
+                f'SELECT key FROM {self.table} WHERE stored_at < ? AND stored_at >= ? ORDER BY stored_at ASC LIMIT ?',
+                (now - max_age, now - self.ttl, limit)
+            ).fetchall()
+        except sqlite3.Error:
+            return []
+        return [row[0] for row in rows]
+
+    def stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0,
+            "evictions": self.evictions,
+            "memory_size": len(self._memory),
+            "ttl": self.ttl,
+        }
+
+# 进程内共享的 HTTP 会话：连接池 + keep-alive + DNS 缓存
+# 图片下载、专栏抓取以及 bilibili_api 自身的请求都复用同一个会话
+HTTP_POOL_LIMIT = 64
+HTTP_POOL_LIMIT_PER_HOST = 16
+HTTP_KEEPALIVE_TIMEOUT = 60
+HTTP_DNS_CACHE_TTL = 300
+# 会话级超时（秒）：不设置时 aiohttp 默认 300 秒。total 与 bilibili_api 请求的默认超时一致，
+# sock_read 限制单次读取的等待时间；图片下载仍按请求单独使用更短的超时
+HTTP_TIMEOUT_TOTAL = 30
+HTTP_TIMEOUT_SOCK_READ = 10
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+}
+
+_http_session = None
+
+def get_http_session() -> 'aiohttp.ClientSession':
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        # 不同群组的凭据共用一个会话，cookies 由每个请求显式携带，禁用会话级 cookie jar 避免串号
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT_TOTAL, sock_read=HTTP_TIMEOUT_SOCK_READ),
+            cookie_jar=aiohttp.DummyCookieJar(),
+            trust_env=True,
+        )
+        if _bilibili_api_ready:
+            _bind_bilibili_session(_http_session)
+    return _http_session
+
+def _bind_bilibili_session(session):
+    # 仅当 bilibili_api 使用 aiohttp 客户端时才能注入会话（curl_cffi/httpx 会话类型不同）
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+        client_name, _ = bili_network.get_selected_client()
+        if client_name != "aiohttp":
+            return
+        # set_session 要求当前事件循环已有客户端，先取出默认客户端再替换并关闭它
+        default_client = bili_network.get_client()
+        if default_client.get_wrapped_session() is not session:
+            bili_network.set_session(session)
+            asyncio.get_running_loop().create_task(default_client.close())
+    except Exception:
+        pass
+
+async def close_http_session():
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+# 自适应限流：按 (凭据文件, 接口族) 分桶的令牌桶，AIMD 调整速率
+# 成功时速率缓慢线性增加；遇到风控（-412/-352/-799 或 HTTP 412）时速率减半并进入冷却，连续风控时冷却时间翻倍
+# 速率与冷却截止时间写入缓存数据库，单次调用模式下各进程也能继承上一次的退避状态
+RATE_LIMIT_ENABLED = os.environ.get('BILI_RATE_LIMIT', '1') != '0'
+RATE_LIMIT_COOLDOWN = float(os.environ.get('BILI_RATE_LIMIT_COOLDOWN', 30))
+RATE_LIMIT_MAX_COOLDOWN = 600
+RATE_LIMIT_MAX_WAIT = 15       # 冷却剩余时间超过该值时直接报错，不占用命令超时时间
+RATE_LIMIT_MIN_RATE = 0.2
+RATE_LIMIT_DECREASE = 0.5
+RATE_LIMIT_INCREASE = 0.05     # 每次成功增加的速率（请求/秒）
+RATE_LIMIT_STATE_TTL = 6 * 3600
+RISK_CONTROL_CODES = {-412, -352, -799}
+
+# 接口族: (初始速率 请求/秒, 最大速率, 桶容量)
+RATE_LIMIT_FAMILIES = {
+    "dynamic": (2.0, 6.0, 4),
+    "space": (1.5, 4.0, 3),
+    "relation": (2.0, 6.0, 4),
+    "live": (5.0, 20.0, 10),
+    "pgc": (4.0, 10.0, 6),
+    "page": (1.0, 4.0, 2),
+    "image": (20.0, 50.0, 20),
+    "api": (3.0, 10.0, 6),
+}
+_RATE_FAMILY_PATTERNS = (
+    ("dynamic", re.compile(r'/x/polymer/|/dynamic_svr/|/x/dynamic/')),
+    ("relation", re.compile(r'/x/relation/')),
+    ("space", re.compile(r'/x/space/')),
+    ("live", re.compile(r'//[^/]*live\.bilibili\.com/')),
+    ("pgc", re.compile(r'/pgc/')),
+    ("image", re.compile(r'//[^/]*hdslb\.com/')),
+    ("page", re.compile(r'//(www\.|m\.)?bilibili\.com/')),
+)
+
+class RateLimitedError(Exception):
+    def __init__(self, key, retry_after):
+        self.key = key
+        self.retry_after = retry_after
+        super().__init__(f"触发风控，冷却中（{key}），约 {int(retry_after) + 1} 秒后重试")
+
+# 当前命令遇到的风控冷却（由 run_command 设置），用于在错误结果中附带 retry_after
+_rate_limit_notice = contextvars.ContextVar('bili_rate_limit_notice', default=None)
+
+def _note_cooldown(retry_after):
+    notice = _rate_limit_notice.get()
+    if notice is not None:
+        notice["retry_after"] = max(notice.get("retry_after", 0), retry_after)
+
+class AdaptiveLimiter:
+    """
+    单个 (凭据文件, 接口族) 的令牌桶。acquire 按当前速率排队等待令牌；
+    on_success / on_risk 根据请求结果调整速率。
+    """
+
+    def __init__(self, credential_key, family):
+        rate, max_rate, burst = RATE_LIMIT_FAMILIES.get(family, RATE_LIMIT_FAMILIES["api"])
+        self.credential_key = credential_key
+        self.family = family
+        self.key = f'{credential_key}|{family}'
+        self.initial_rate = rate
+        self.rate = rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.blocked_until = 0.0
+        self.consecutive_risks = 0
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        self.requests = 0
+        self.successes = 0
+        self.risks = 0
+        self.rejected = 0
+        self.waited = 0.0
+        self.last_risk = None
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            cooldown = self.blocked_until - time.time()
+            if cooldown > RATE_LIMIT_MAX_WAIT:
+                self.rejected += 1
+                _note_cooldown(cooldown)
+                raise RateLimitedError(self.key, cooldown)
+            if cooldown > 0:
+                self.waited += cooldown
+                await asyncio.sleep(cooldown)
+                self._updated = time.monotonic()
+            self._refill()
+            if self.tokens < 1:
+                delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+                self._refill()
+            self.tokens -= 1
+            self.requests += 1
+
+    def on_success(self):
+        self.successes += 1
+        self.consecutive_risks = 0
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + RATE_LIMIT_INCREASE)
+            self._dirty = True
+
+    def on_risk(self, code):
+        self.risks += 1
+        self.consecutive_risks += 1
+        self.rate = max(RATE_LIMIT_MIN_RATE, self.rate * RATE_LIMIT_DECREASE)
+        self.tokens = 0.0
+        cooldown = min(RATE_LIMIT_MAX_COOLDOWN, RATE_LIMIT_COOLDOWN * 2 ** (self.consecutive_risks - 1))
+        self.blocked_until = max(self.blocked_until, time.time() + cooldown)
+        self.last_risk = {"code": code, "at": int(time.time())}
+        _note_cooldown(cooldown)
+        print(f"Rate limiter {self.key}: risk control {code}, rate -> {self.rate:.2f}/s, cooldown {cooldown:.0f}s", file=sys.stderr)
+        self._dirty = True
+        _save_limiter_state(self)
+
+    def stats(self):
+        return {
+            "rate": round(self.rate, 3),
+            "max_rate": self.max_rate,
+            "burst": self.burst,
+            "tokens": round(min(self.burst, self.tokens + (time.monotonic() - self._updated) * self.rate), 2),
+            "cooldown": max(0, round(self.blocked_until - time.time(), 1)),
+            "requests": self.requests,
+            "successes": self.successes,
+            "risks": self.risks,
+            "rejected": self.rejected,
+            "waited": round(self.waited, 2),
+            "last_risk": self.last_risk,
         }
+
+_limiters = {}
+
+def _limiter_table():
+    conn = _get_cache_db()
+    if conn is None:
+        return None
+    try:
+        conn.execute('CREATE TABLE IF NOT EXISTS rate_limit_state (key TEXT PRIMARY KEY, rate REAL NOT NULL, blocked_until REAL NOT NULL, consecutive_risks INTEGER NOT NULL, updated_at REAL NOT NULL)')
+    except sqlite3.Error:
+        return None
+    return conn
+
+def _load_limiter_state(limiter):
+    conn = _limiter_table()
+    if conn is None:
+        return
+    try:
+        row = conn.execute('SELECT rate, blocked_until, consecutive_risks, updated_at FROM rate_limit_state WHERE key = ?', (limiter.key,)).fetchone()
+    except sqlite3.Error:
+        return
+    if row and time.time() - row[3] < RATE_LIMIT_STATE_TTL:
+        limiter.rate = min(limiter.max_rate, max(RATE_LIMIT_MIN_RATE, row[0]))
+        limiter.blocked_until = row[1]
+        limiter.consecutive_risks = row[2]
+
+def _save_limiter_state(limiter):
+    if not limiter._dirty:
+        return
+    conn = _limiter_table()
+    if conn is None:
+        return
+    try:
+        conn.execute(
+            'INSERT OR REPLACE INTO rate_limit_state (key, rate, blocked_until, consecutive_risks, updated_at) VALUES (?, ?, ?, ?, ?)',
+            (limiter.key, limiter.rate, limiter.blocked_until, limiter.consecutive_risks, time.time())
+        )
+        limiter._dirty = False
+    except sqlite3.Error:
+        pass
+
+def flush_rate_limiters():
+    # 退出前保存成功请求带来的速率提升（风控状态在发生时已立即写入）
+    for limiter in _limiters.values():
+        _save_limiter_state(limiter)
+
+def _rate_family(url):
+    for family, pattern in _RATE_FAMILY_PATTERNS:
+        if pattern.search(url):
+            return family
+    return "api"
+
+def _credential_key(credential):
+    # 通过凭据注册表反查凭据文件；未注册的凭据（如扫码登录过程中）按匿名处理
+    sessdata = getattr(credential, 'sessdata', None) if credential is not None else None
+    if not sessdata:
+        return "anonymous"
+    for path, (_, registered) in _credential_registry.items():
+        if registered is credential or registered.sessdata == sessdata:
+            return path
+    return "anonymous"
+
+def get_limiter(url, credential=None):
+    key = (_credential_key(credential), _rate_family(url))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limiter = AdaptiveLimiter(*key)
+        _load_limiter_state(limiter)
+        _limiters[key] = limiter
+    return limiter
+
+def _observe_status(limiter, status):
+    # 直接 aiohttp 请求的结果反馈
+    if status == 412:
+        limiter.on_risk(412)
+    elif status < 400:
+        limiter.on_success()
+
+_api_request = None
+
+async def _limited_api_request(self, raw=False, byte=False):
+    if not RATE_LIMIT_ENABLED:
+        return await _api_request(self, raw=raw, byte=byte)
+    limiter = get_limiter(self.url, self.credential)
+    await limiter.acquire()
+    try:
+        ret = await _api_request(self, raw=raw, byte=byte)
+    except bili_exceptions.ResponseCodeException as e:
+        if e.code in RISK_CONTROL_CODES:
+            limiter.on_risk(e.code)
+        raise
+    except bili_exceptions.NetworkException as e:
+        if e.status == 412:
+            limiter.on_risk(412)
+        raise
+    # raw 模式下接口错误码不会抛出异常，需要自行检查
+    if raw and isinstance(ret, dict) and ret.get("code") in RISK_CONTROL_CODES:
+        limiter.on_risk(ret.get("code"))
+    else:
+        limiter.on_success()
+    return ret
+
+_bilibili_api_ready = False
+
+def _init_bilibili_api():
+    # bilibili_api 首次导入后的一次性初始化：接入限流，并让它复用共享会话
+    global _api_request, _bilibili_api_ready
+    if _bilibili_api_ready:
+        return
+    _bilibili_api_ready = True
+    # bilibili_api 的所有接口请求都经过 Api._request，在此统一接入限流
+    api_class = importlib.import_module('bilibili_api.utils.network').Api
+    _api_request = api_class._request
+    api_class._request = _limited_api_request
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # 没有运行中的事件循环时，等 get_http_session 创建会话时再注入
+        return
+    if _http_session is None or _http_session.closed:
+        get_http_session()
+    else:
+        _bind_bilibili_session(_http_session)
+
+async def _fetch_bytes(url: str, max_bytes: int = None) -> bytes:
+    try:
         timeout = aiohttp.ClientTimeout(total=6)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, headers=headers) as resp:
-                if resp.status == 200:
+        session = get_http_session()
+        limiter = get_limiter(url) if RATE_LIMIT_ENABLED else None
+        if limiter is not None:
+            await limiter.acquire()
+        async with session.get(url, headers=DEFAULT_HEADERS, timeout=timeout) as resp:
+            if limiter is not None:
+                _observe_status(limiter, resp.status)
+            if resp.status == 200:
+                if max_bytes is None:
                     return await resp.read()
+                # 超过上限的部分不再下载
+                chunks = []
+                size = 0
+                async for chunk in resp.content.iter_chunked(64 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= max_bytes:
+                        break
+                return b"".join(chunks)[:max_bytes]
     except Exception:
         return b""
     return b""
@@ -92,7 +684,7 @@ def _rgb_to_hex(rgb):
     r, g, b = rgb
     return '#{:02x}{:02x}{:02x}'.format(r, g, b)
 
-def _choose_focus_color(img: Image.Image) -> str:
+def _choose_focus_color_py(img: 'Image.Image') -> str:
     try:
         im = img.convert('RGB')
         im = im.resize((64, 64))
@@ -122,18 +714,210 @@ def _choose_focus_color(img: Image.Image) -> str:
     except Exception:
         return '#ffffff'
 
+def _focus_color_scores(img: 'Image.Image'):
+    """
+    对 64x64 缩略图一次性计算所有颜色的得分。
+    返回 (im, colors, scores, avg)：im 为缩略图，colors 为 Nx3 的唯一颜色，scores 中未通过 v/s 阈值的颜色为 -1，avg 为平均色。
+    计算方式与 colorsys.rgb_to_hsv 逐项一致；同分颜色的先后由 _rank_focus_colors 处理。
+    """
+    np = _numpy()
+    im = img.convert('RGB').resize((64, 64))
+    pixels = np.asarray(im, dtype=np.uint32).reshape(-1, 3)
+    packed = (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+    uniq, counts = np.unique(packed, return_counts=True)
+    colors = np.stack(((uniq >> 16) & 0xFF, (uniq >> 8) & 0xFF, uniq & 0xFF), axis=1)
+
+    rgb = colors / 255.0
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sat = np.where(maxc > 0, (maxc - minc) / maxc, 0.0)
+    val = maxc
+    scores = (sat * 0.7 + val * 0.3) * counts
+    scores[(val < 0.15) | (sat < 0.15)] = -1.0
+
+    total = int(counts.sum())
+    sums = (colors * counts[:, None]).sum(axis=0)
+    avg = tuple(int(int(c) / total) for c in sums) if total else (255, 255, 255)
+    return im, colors, scores, avg
+
+def _rank_focus_colors(im, colors, scores, top_n):
+    """
+    按得分从高到低返回前 top_n 个颜色的下标。np.unique 按 RGB 数值排序，而纯 Python 实现遇到同分时
+    取 getcolors 中先出现的颜色；只有前 top_n 名中存在同分时才读取 getcolors 的顺序来排列同分颜色。
+    """
+    np = _numpy()
+    order = np.argsort(-scores, kind='stable')
+    if not len(order):
+        return order
+    cutoff = scores[order[min(top_n, len(order)) - 1]]
+    leading = scores[scores >= max(cutoff, 0)]
+    if len(np.unique(leading)) < len(leading):
+        position = {rgb: i for i, (_, rgb) in enumerate(im.getcolors(maxcolors=100000) or [])}
+        rank = np.array([position.get(tuple(int(c) for c in color), len(position)) for color in colors])
+        order = np.lexsort((rank, -scores))
+    return order[:top_n]
+
+def _choose_focus_color(img: 'Image.Image') -> str:
+    np = _numpy()
+    if np is None:
+        return _choose_focus_color_py(img)
+    try:
+        im, colors, scores, avg = _focus_color_scores(img)
+        best = int(_rank_focus_colors(im, colors, scores, 1)[0])
+        if scores[best] < 0:
+            return _rgb_to_hex(avg)
+        return _rgb_to_hex(tuple(int(c) for c in colors[best]))
+    except Exception:
+        return '#ffffff'
+
+def _choose_focus_palette(img: 'Image.Image', top_n: int = 5) -> list:
+    """按与 _choose_focus_color 相同的得分返回前 top_n 个颜色，没有颜色通过阈值时返回平均色。"""
+    np = _numpy()
+    if np is None:
+        return [_choose_focus_color_py(img)]
+    try:
+        im, colors, scores, avg = _focus_color_scores(img)
+        order = _rank_focus_colors(im, colors, scores, top_n)
+        palette = [_rgb_to_hex(tuple(int(c) for c in colors[i])) for i in order if scores[i] >= 0]
+        return palette or [_rgb_to_hex(avg)]
+    except Exception:
+        return ['#ffffff']
+
+# 同一图片 URL 的主色不会变化，按 URL 缓存计算结果
+FOCUS_COLOR_CACHE_TTL = 30 * 24 * 3600
+focus_color_cache = TwoTierCache('focus_color', ttl=FOCUS_COLOR_CACHE_TTL, max_memory=4096, max_disk=100000)
+
+def _focus_cache_key(url: str) -> str:
+    # http/https 与协议相对地址指向同一张图片
+    return re.sub(r'^(https?:)?//', '', url.strip())
+
+# 主色采样只需要 64x64 的缩略图：B 站图床直接请求服务端缩放后的 webp，其它图片限制下载大小并降采样解码
+FOCUS_SAMPLE_SIZE = 64
+FOCUS_MAX_BYTES = 2 * 1024 * 1024
+_HDSLB_IMAGE_RE = re.compile(r'^((?:https?:)?//[^/?#]*\.hdslb\.com/[^?#@]+?\.(?:jpe?g|png|gif|webp|bmp))(?:@[^?#]*)?(?:[?#].*)?$', re.IGNORECASE)
+
+def _thumbnail_url(url: str):
+    match = _HDSLB_IMAGE_RE.match(url.strip())
+    if not match:
+        return None
+    base = match.group(1)
+    if base.startswith('//'):
+        base = 'https:' + base
+    return f'{base}@{FOCUS_SAMPLE_SIZE}w_{FOCUS_SAMPLE_SIZE}h.webp'
+
+async def _fetch_sample_bytes(url: str) -> bytes:
+    thumb = _thumbnail_url(url)
+    if thumb:
+        data = await _fetch_bytes(thumb, max_bytes=FOCUS_MAX_BYTES)
+        if data:
+            return data
+    return await _fetch_bytes(url, max_bytes=FOCUS_MAX_BYTES)
+
+def _open_sample_image(data: bytes) -> 'Image.Image':
+    img = Image.open(io.BytesIO(data))
+    # JPEG 在解码阶段按 1/2~1/8 缩放；动图只解码当前（第一）帧
+    img.draft('RGB', (FOCUS_SAMPLE_SIZE * 2, FOCUS_SAMPLE_SIZE * 2))
+    return img
+
 async def get_image_focus_color(url: str) -> str:
     if not url:
         return None
+    key = _focus_cache_key(url)
+    cached = focus_color_cache.get(key)
+    if cached is not None:
+        return cached
     try:
-        data = await _fetch_bytes(url)
+        data = await _fetch_sample_bytes(url)
         if not data:
             return None
-        img = Image.open(io.BytesIO(data))
-        return _choose_focus_color(img)
+        img = _open_sample_image(data)
+        color = _choose_focus_color(img)
+        focus_color_cache.set(key, color)
+        return color
     except Exception:
         return None
 
+async def get_image_palette(url, top_n=5):
+    try:
+        data = await _fetch_sample_bytes(url)
+        if not data:
+            return {"status": "error", "message": "无法下载图片"}
+        img = _open_sample_image(data)
+        return {"status": "success", "type": "palette", "data": _choose_focus_palette(img, int(top_n))}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# 流式输出：批量命令通过 emit_item 逐条返回结果
+# 单次调用模式下每条输出一行 NDJSON，常驻模式下以 {"id", "item"} 推送给对应请求
+_stream_emit = contextvars.ContextVar('stream_emit', default=None)
+
+async def emit_item(item):
+    emit = _stream_emit.get()
+    if emit is not None:
+        await emit(item)
+
+def _load_batch_items(items):
+    # 参数可以是 JSON 字符串、"-"（从 stdin 读取）或已解析的列表
+    if isinstance(items, str):
+        items = json.loads(sys.stdin.read() if items == '-' else items)
+    if isinstance(items, dict):
+        items = items.get('items') or []
+    return [entry if isinstance(entry, dict) else {"uid": entry} for entry in items]
+
+# 补充信息并发框架：各处理函数声明互不依赖的子请求，统一并发执行
+ENRICH_CONCURRENCY = 6
+
+def _collect_results(names, results, errors):
+    done = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            # 取消（CancelledError）等不是请求失败，不能当作结果保存，继续向上传递
+            if not isinstance(result, Exception):
+                raise result
+            if errors is not None:
+                errors[name] = result
+        else:
+            done[name] = result
+    return done
+
+async def run_enrichments(tasks: dict, limit: int = ENRICH_CONCURRENCY, errors: dict = None) -> dict:
+    """
+    并发执行 字段名 -> 协程 的补充请求，最多同时运行 limit 个。
+    返回成功字段的结果；失败的字段不会出现在返回值中（异常写入可选的 errors），由调用方决定默认值。
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(coro):
+        async with semaphore:
+            return await coro
+
+    names = list(tasks)
+    results = await asyncio.gather(*(run(tasks[name]) for name in names), return_exceptions=True)
+    return _collect_results(names, results, errors)
+
+async def run_dependency_graph(nodes: dict, limit: int = ENRICH_CONCURRENCY, errors: dict = None) -> dict:
+    """
+    按依赖关系并发执行请求图：nodes 为 节点名 -> (依赖的节点名元组, 接收依赖结果字典并返回协程的函数)，图中不能有环。
+    每个节点在其依赖全部完成后立即开始，互不依赖的节点并发运行（最多同时 limit 个）。
+    依赖失败的节点同样失败；返回值与 errors 的约定同 run_enrichments。
+    """
+    semaphore = asyncio.Semaphore(limit)
+    tasks = {}
+
+    async def run(name):
+        deps, factory = nodes[name]
+        values = {dep: await tasks[dep] for dep in deps}
+        async with semaphore:
+            return await factory(values)
+
+    # 任务在下一轮事件循环才开始执行，此时所有节点的任务都已创建
+    for name in nodes:
+        tasks[name] = asyncio.ensure_future(run(name))
+    names = list(tasks)
+    results = await asyncio.gather(*(tasks[name] for name in names), return_exceptions=True)
+    return _collect_results(names, results, errors)
+
 async def get_video_info(bvid, group_id=None):
     try:
         if str(bvid).lower().startswith('av'):
@@ -145,111 +929,309 @@ async def get_video_info(bvid, group_id=None):
         cover_url = info.get('pic') or ''
         owner = info.get('owner') or {}
         avatar_url = owner.get('face') or ''
-        cover_focus = await get_image_focus_color(cover_url)
-        avatar_focus = await get_image_focus_color(avatar_url)
+        focus = await run_enrichments({
+            "cover": get_image_focus_color(cover_url),
+            "avatar": get_image_focus_color(avatar_url),
+        })
         info['focus'] = {
-            "cover": cover_focus,
-            "avatar": avatar_focus
+            "cover": focus.get('cover'),
+            "avatar": focus.get('avatar')
         }
         return {"status": "success", "type": "video", "data": info}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-async def get_bangumi_info(season_id, group_id=None):
-    try:
-        # 使用ssid参数初始化Bangumi类，这对某些番剧是必需的
-        b = bangumi.Bangumi(ssid=int(season_id), credential=load_credential(group_id))
-
-        # 首先使用season_id获取meta信息，以获取media_id
-        try:
-            meta = await b.get_meta()
-            media_id = meta.get('media', {}).get('media_id')
-
-            if media_id:
-                # 如果获取到media_id，使用它创建新的Bangumi实例来获取详细信息
-                b_with_media = bangumi.Bangumi(media_id=int(media_id), credential=load_credential(group_id))
-
-                # 获取overview和stat信息
-                try:
-                    overview = await b_with_media.get_overview()
-                except:
-                    # 如果获取overview失败，至少使用meta中的信息
-                    overview = meta.get('media', {})
-
-                try:
-                    stat = await b_with_media.get_stat()
-                except:
-                    stat = {}
-            else:
-                # 如果没有获取到media_id，尝试直接使用season_id
-                try:
-                    overview = await b.get_overview()
-                except:
-                    overview = meta.get('media', {})
-
-                try:
-                    stat = await b.get_stat()
-                except:
-                    stat = {}
-        except Exception as meta_error:
-            # 如果get_meta失败，尝试直接使用season_id
-            try:
-                overview = await b.get_overview()
-            except:
-                return {"status": "error", "message": f"无法获取番剧信息: {str(meta_error)}"}
-
-            try:
-                stat = await b.get_stat()
-            except:
-                stat = {}
-
-        # Get additional details
-        try:
-            detail = await b.get_detail()
-        except:
-            detail = {}
-
-        # 构建返回数据
-        data = {
-            "title": overview.get('title', overview.get('season_title', '')),
-            "cover": overview.get('cover', ''),
-            "desc": overview.get('evaluate', overview.get('desc', '')),
-            "stat": stat,
-            "new_ep": overview.get('new_ep', {}),
-            "rating": overview.get('rating', {}),
-            "styles": overview.get('styles', []),
-            "areas": overview.get('areas', []),
-            "publish": overview.get('publish', {}),
-            "season_id": overview.get('season_id', season_id),
-            "season_type": overview.get('season_type'),
-            "type_desc": overview.get('type_desc'),
-            "series": overview.get('series', {}),
-            "detail": detail,
-            "focus": {
-                "cover": await get_image_focus_color(overview.get('cover', ''))
-            }
+# 番剧季度缓存：概览（标题、封面、简介、分集等）很少变化，播放统计变化频繁，两者按各自的 TTL 刷新；
+# 元数据（pgc/review/user）随概览一起过期。ep_id / media_id -> season_id 的对应关系不会变化，长期保存，
+# 已知季度的分集链接只需一次分集相关的请求（或完全命中缓存）。数据与凭据无关，所有群共用
+SEASON_OVERVIEW_TTL = int(os.environ.get('BILI_SEASON_OVERVIEW_TTL', 6 * 3600))
+SEASON_STAT_TTL = int(os.environ.get('BILI_SEASON_STAT_TTL', 600))
+SEASON_VIEW_URL = "https://api.bilibili.com/pgc/view/web/simple/season"
+season_overview_cache = TwoTierCache('season_overview', SEASON_OVERVIEW_TTL, max_memory=256, max_disk=20000)
+season_meta_cache = TwoTierCache('season_meta', SEASON_OVERVIEW_TTL, max_memory=256, max_disk=20000)
+season_stat_cache = TwoTierCache('season_stat', SEASON_STAT_TTL, max_memory=256, max_disk=20000)
+season_index_cache = TwoTierCache('season_index', 365 * 24 * 3600, max_memory=4096, max_disk=200000)  # "ep:<id>" / "md:<id>" -> season_id
+
+def _store_season_overview(overview):
+    season_id = overview.get('season_id')
+    if not season_id:
+        return
+    season_overview_cache.set(str(season_id), overview)
+    if overview.get('media_id'):
+        season_index_cache.set(f"md:{overview['media_id']}", season_id)
+
+async def _season_overview(season_id, credential, max_age=None):
+    # max_age 可以要求比 TTL 更新的概览（订阅检查需要最新的 new_ep）
+    entry = season_overview_cache.get_entry(str(season_id))
+    if entry is not None and (max_age is None or time.time() - entry[1] < max_age):
+        return entry[0]
+    overview = await bangumi.Bangumi(ssid=int(season_id), credential=credential).get_overview()
+    _store_season_overview(overview)
+    return overview
+
+async def _episode_overview(ep_id, credential, max_age=None):
+    ep_id = int(ep_id)
+    season_id = season_index_cache.get(f"ep:{ep_id}")
+    if season_id is not None:
+        return await _season_overview(season_id, credential, max_age)
+    # 未知分集：概览接口直接接受 ep_id，一次请求同时得到 season_id 与概览
+    api = bili_network.Api(SEASON_VIEW_URL, method="GET", credential=credential)
+    api.update_params(ep_id=ep_id)
+    overview = await api.result
+    _store_season_overview(overview)
+    if overview.get('season_id'):
+        season_index_cache.set(f"ep:{ep_id}", overview['season_id'])
+    return overview
+
+async def _season_stat(season_id, credential):
+    stat = season_stat_cache.get(str(season_id))
+    if stat is None:
+        stat = await bangumi.Bangumi(ssid=int(season_id), credential=credential).get_stat()
+        season_stat_cache.set(str(season_id), stat)
+    return stat
+
+async def _season_meta(season_id, media_id, credential):
+    media = season_meta_cache.get(str(season_id))
+    if media is None:
+        if not media_id:
+            raise ValueError("番剧概览中没有 media_id")
+        meta = await bangumi.Bangumi(media_id=int(media_id), ssid=int(season_id), credential=credential).get_meta()
+        media = meta.get('media', {})
+        season_meta_cache.set(str(season_id), media)
+    return media
+
+async def _media_season_id(media_id, credential):
+    media_id = int(media_id)
+    season_id = season_index_cache.get(f"md:{media_id}")
+    if season_id is not None:
+        return season_id
+    meta = await bangumi.Bangumi(media_id=media_id, credential=credential).get_meta()
+    media = meta.get('media', {})
+    season_id = media.get('season_id')
+    if not season_id:
+        raise ValueError("番剧元数据中没有 season_id")
+    season_index_cache.set(f"md:{media_id}", season_id)
+    season_meta_cache.set(str(season_id), media)
+    return season_id
+
+# 番剧解析：season_id / media_id / ep_id 三种入口共用同一张请求依赖图，各节点先查季度缓存。
+# 从 season_id 出发：概览与播放统计并发，概览给出 media_id 后再并发取元数据与封面主色；
+# 从 media_id 出发：先确定 season_id（索引或元数据），再并发取概览、统计、元数据与封面主色；
+# 从 ep_id 出发：先取概览（索引命中时走季度缓存），再并发取统计、元数据与封面主色
+def _bangumi_graph(season_id=None, media_id=None, ep_id=None, credential=None, max_age=None):
+    async def season_from_overview(deps):
+        if not deps['overview'].get('season_id'):
+            raise ValueError("番剧概览中没有 season_id")
+        return deps['overview']['season_id']
+
+    async def meta(deps):
+        return await _season_meta(deps['season'], media_id or deps['overview'].get('media_id'), credential)
+
+    async def cover_focus(deps):
+        source = deps.get('overview') or deps.get('meta') or {}
+        return await get_image_focus_color(source.get('cover', ''))
+
+    nodes = {
+        "stat": (("season",), lambda deps: _season_stat(deps['season'], credential)),
+        "meta": (("season", "overview"), meta),
+        "cover_focus": (("overview",), cover_focus),
+    }
+    if ep_id is not None:
+        nodes["overview"] = ((), lambda deps: _episode_overview(ep_id, credential, max_age))
+        nodes["season"] = (("overview",), season_from_overview)
+        return nodes
+
+    async def season(deps):
+        if season_id is not None:
+            return int(season_id)
+        return await _media_season_id(media_id, credential)
+
+    nodes["season"] = ((), season)
+    nodes["overview"] = (("season",), lambda deps: _season_overview(deps['season'], credential, max_age))
+    if media_id is not None:
+        # 已知 media_id 时元数据不必等概览，封面也取自元数据
+        nodes["meta"] = (("season",), meta)
+        nodes["cover_focus"] = (("meta",), cover_focus)
+    return nodes
+
+async def resolve_bangumi(season_id=None, media_id=None, ep_id=None, group_id=None, max_age=None):
+    errors = {}
+    graph = _bangumi_graph(season_id, media_id, ep_id, load_credential(group_id), max_age)
+    results = await run_dependency_graph(graph, errors=errors)
+    meta_media = results.get('meta', {})
+    overview = results.get('overview')
+    if overview is None:
+        # 概览失败时至少使用元数据中的信息；两者都没有则无法展示
+        if not meta_media:
+            error = errors.get('overview') or errors.get('season') or errors.get('meta')
+            raise Exception(f"无法获取番剧信息: {error}")
+        overview = meta_media
+
+    return {
+        "title": overview.get('title', overview.get('season_title', '')),
+        "cover": overview.get('cover', ''),
+        "desc": overview.get('evaluate', overview.get('desc', '')),
+        "stat": results.get('stat', {}),
+        "new_ep": overview.get('new_ep', {}),
+        "rating": overview.get('rating', {}),
+        "styles": overview.get('styles', []),
+        "areas": overview.get('areas', []),
+        "publish": overview.get('publish', {}),
+        "season_id": overview.get('season_id', season_id),
+        "season_type": overview.get('season_type'),
+        "type_desc": overview.get('type_desc'),
+        "series": overview.get('series', {}),
+        # 元数据（pgc/review/user）中的条目信息
+        "detail": meta_media,
+        "focus": {
+            "cover": results.get('cover_focus')
         }
+    }
 
+async def get_bangumi_info(season_id, group_id=None, max_age=None):
+    try:
+        max_age = int(max_age) if max_age not in (None, '') else None
+        data = await resolve_bangumi(season_id=season_id, group_id=group_id, max_age=max_age)
         return {"status": "success", "type": "bangumi", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+# ID 类型解析索引：Opus、专栏、动态三者的 ID 会互相跳转（图文可能对应专栏，专栏页面可能重定向回 Opus，
+# 动态可能只给出 Opus 链接），判断类型本身就要额外请求。解析结果持久保存，之后直接交给对应的处理函数：
+#   "opus:<id>" -> {"kind": "article", "cvid"} 或 {"kind": "dynamic"}
+#   "cv:<id>"   -> {"kind": "opus", "id"} 或 {"kind": "article"}（页面没有重定向）
+#   "dyn:<id>"  -> {"kind": "opus", "id"}
+# 处理函数之间的跳转经 _follow_route 进行，嵌套超过 ID_ROUTE_MAX_DEPTH 层时直接返回错误，避免循环跳转
+ID_ROUTE_TTL = 30 * 24 * 3600
+ID_ROUTE_MAX_DEPTH = 3
+id_route_cache = TwoTierCache('id_route', ID_ROUTE_TTL, max_memory=2048, max_disk=100000)
+_route_depth = contextvars.ContextVar('bili_route_depth', default=0)
+
+async def _follow_route(handler, *args):
+    depth = _route_depth.get()
+    if depth >= ID_ROUTE_MAX_DEPTH:
+        return {"status": "error", "message": f"内容跳转次数过多（超过 {ID_ROUTE_MAX_DEPTH} 层）"}
+    token = _route_depth.set(depth + 1)
+    try:
+        return await handler(*args)
+    finally:
+        _route_depth.reset(token)
+
 async def get_opus_detail(opus_id, group_id=None):
     try:
-        o = opus.Opus(int(opus_id), credential=load_credential(group_id))
-        if await o.is_article():
-            result = await get_article_info(opus_id, group_id)
+        opus_id = int(opus_id)
+        route = id_route_cache.get(f"opus:{opus_id}")
+        if route is None:
+            o = opus.Opus(opus_id, credential=load_credential(group_id))
+            if await o.is_article():
+                route = {"kind": "article", "cvid": (await o.turn_to_article()).get_cvid()}
+            else:
+                route = {"kind": "dynamic"}
+            id_route_cache.set(f"opus:{opus_id}", route)
+
+        if route.get('kind') == 'article':
+            result = await _follow_route(get_article_info, str(route['cvid']), group_id)
             if result.get('status') == 'success':
                 return result
             # If article fetch fails (e.g. 404), fallback to dynamic detail
-            
-        return await get_dynamic_detail(opus_id, group_id)
+
+        return await _follow_route(get_dynamic_detail, opus_id, group_id)
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
 
-async def get_article_info(cvid, group_id=None):
+# 专栏正文提取：摘要与 HTML 均有长度上限，达到上限即停止累积
+ARTICLE_SUMMARY_LIMIT = 2500
+ARTICLE_HTML_LIMIT = 20000
+_ARTICLE_HOLDER_XPATH = (
+    '//*[contains(concat(" ", normalize-space(@class), " "), " article-holder ")]'
+    ' | //*[@id="read-article-holder"]'
+    ' | //*[contains(concat(" ", normalize-space(@class), " "), " opus-module-content ")]'
+)
+
+def _extract_article(page, summary_limit=ARTICLE_SUMMARY_LIMIT, html_limit=ARTICLE_HTML_LIMIT):
+    """
+    用 lxml 解析专栏页面，只处理正文容器节点（找不到时退回 body）。
+    返回 (summary, html_content)：summary 为按行拼接的纯文本，html_content 按顶层子节点截断，
+    html_limit 为 0 时不生成 HTML。
+    """
+    if isinstance(page, bytes):
+        page = page.decode('utf-8', errors='replace')
+    doc = lxml_html.fromstring(page)
+    holders = doc.xpath(_ARTICLE_HOLDER_XPATH)
+    if holders:
+        root = holders[0]
+    else:
+        body = doc.find('body')
+        root = body if body is not None else doc
+    for node in root.xpath('.//script | .//style'):
+        node.drop_tree()
+
+    lines = []
+    size = 0
+    for text in root.itertext():
+        text = text.strip()
+        if not text:
+            continue
+        lines.append(text)
+        size += len(text) + 1
+        if size >= summary_limit:
+            break
+    summary = '\n'.join(lines)[:summary_limit]
+
+    parts = []
+    if html_limit:
+        size = 0
+        if root.text and root.text.strip():
+            parts.append(html_lib.escape(root.text))
+            size += len(parts[-1])
+        for child in root:
+            if size >= html_limit:
+                break
+            chunk = lxml_html.tostring(child, encoding='unicode')
+            parts.append(chunk)
+            size += len(chunk)
+    return summary, ''.join(parts)
+
+async def _load_article_text(cvid_int, html_limit=ARTICLE_HTML_LIMIT):
+    """
+    抓取专栏正文，返回 {"summary", "html_content", "opus_id", "fetched"}。
+    opus_id 不为空表示专栏页面已跳转到 Opus，应改用 Opus 详情；fetched 表示页面正常取回（未跳转）。
+    """
+    summary = ""
+    html_content = ""
+    fetched = False
+    try:
+        url = f"https://www.bilibili.com/read/cv{cvid_int}"
+        session = get_http_session()
+        limiter = get_limiter(url) if RATE_LIMIT_ENABLED else None
+        if limiter is not None:
+            await limiter.acquire()
+        async with session.get(url, headers=DEFAULT_HEADERS) as resp:
+            if limiter is not None:
+                _observe_status(limiter, resp.status)
+            # Check for redirect to Opus
+            final_url = str(resp.url)
+            if '/opus/' in final_url:
+                opus_match = re.search(r'/opus/(\d+)', final_url)
+                if opus_match:
+                    return {"summary": "", "html_content": "", "opus_id": opus_match.group(1), "fetched": False}
+
+            if resp.status == 200:
+                page = await resp.text()
+                summary, html_content = _extract_article(page, html_limit=html_limit)
+                fetched = True
+    except Exception as e:
+        summary = f"无法抓取正文: {str(e)}"
+        html_content = ""
+
+    return {"summary": summary, "html_content": html_content, "opus_id": None, "fetched": fetched}
+
+async def get_article_info(cvid, group_id=None, html_limit=None):
+    """
+    获取专栏信息与正文。html_limit 为 html_content 的最大长度（默认 ARTICLE_HTML_LIMIT），传 0 则不返回 HTML。
+    """
     try:
         # Clean cvid: remove 'cv' prefix
         # Handle cases like "cv123456?param=1" -> "123456"
@@ -263,77 +1245,13 @@ async def get_article_info(cvid, group_id=None):
              return {"status": "error", "message": "Invalid Article ID"}
              
         cvid_int = int(match.group(1))
-        a = article.Article(cvid_int, credential=load_credential(group_id))
+        route = id_route_cache.get(f"cv:{cvid_int}")
+        if route and route.get('kind') == 'opus':
+            return await _follow_route(get_opus_detail, route['id'], group_id)
+        credential = load_credential(group_id)
+        a = article.Article(cvid_int, credential=credential)
         info = await a.get_info()
 
-        # 获取作者信息（头像等）
-        author_mid = info.get('mid')
-        author_face = None
-        if author_mid:
-            try:
-                u = user.User(uid=int(author_mid), credential=load_credential(group_id))
-                author_info = await u.get_user_info()
-                author_face = author_info.get('face')
-            except:
-                pass
-
-        # 如果通过API获取失败，从info中尝试获取
-        if not author_face:
-            author_face = info.get('author', {}).get('face') if isinstance(info.get('author'), dict) else None
-
-        # Try to get content for summary
-        summary = ""
-        html_content = ""
-        try:
-            content = await a.fetch_content()
-            html_content = content
-            summary = re.sub('<[^<]+?>', '', content)
-        except Exception:
-            pass
-
-        # Fallback scraping if summary is empty/failed
-        if not summary or len(summary) < 10:
-            try:
-                url = f"https://www.bilibili.com/read/cv{cvid_int}"
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-                }
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(url, headers=headers) as resp:
-                        # Check for redirect to Opus
-                        final_url = str(resp.url)
-                        if '/opus/' in final_url:
-                            opus_match = re.search(r'/opus/(\d+)', final_url)
-                            if opus_match:
-                                opus_id = opus_match.group(1)
-                                return await get_opus_detail(opus_id, group_id)
-
-                        if resp.status == 200:
-                            html = await resp.text()
-                            soup = BeautifulSoup(html, 'html.parser')
-                            # Try specific holders first
-                            holder = soup.find(class_='article-holder') or soup.find(id='read-article-holder') or soup.find(class_='opus-module-content')
-                            if holder:
-                                # Clean up scripts/styles from holder
-                                for script in holder(["script", "style"]):
-                                    script.extract()
-                                html_content = holder.decode_contents()
-                                summary = holder.get_text(separator='\n', strip=True)
-                            else:
-                                # Fallback to body text, removing scripts/styles
-                                for script in soup(["script", "style"]):
-                                    script.extract()
-                                html_content = soup.body.decode_contents() if soup.body else soup.decode_contents()
-                                summary = soup.get_text(separator='\n', strip=True)
-            except Exception as e:
-                summary = f"无法抓取正文: {str(e)}"
-                html_content = ""
-
-        info['summary'] = summary[:2500] if summary else '点击查看详情'
-        info['html_content'] = html_content
-
-        info['author_face'] = author_face  # 添加作者头像
-        
         # Determine cover image
         cover = info.get('banner_url')
         if not cover and info.get('image_urls'):
@@ -341,9 +1259,50 @@ async def get_article_info(cvid, group_id=None):
         if not cover:
             cover = ''
 
+        async def load_author():
+            # 获取作者信息（头像等）
+            author_mid = info.get('mid')
+            author_face = None
+            if author_mid:
+                try:
+                    u = user.User(uid=int(author_mid), credential=credential)
+                    author_info = await u.get_user_info()
+                    author_face = author_info.get('face')
+                except:
+                    pass
+
+            # 如果通过API获取失败，从info中尝试获取
+            if not author_face:
+                author_face = info.get('author', {}).get('face') if isinstance(info.get('author'), dict) else None
+            return author_face, await get_image_focus_color(author_face)
+
+        # 作者信息、正文与封面主色互不依赖，并发获取
+        enriched = await run_enrichments({
+            "author": load_author(),
+            "text": _load_article_text(cvid_int, ARTICLE_HTML_LIMIT if html_limit in (None, '', 'None') else int(html_limit)),
+            "cover_focus": get_image_focus_color(cover),
+        })
+
+        text = enriched.get('text') or {}
+        if text.get('opus_id'):
+            # 专栏页面重定向到 Opus：记录跳转，并且该 Opus 不能再按专栏处理，否则会来回跳转
+            opus_id = int(text['opus_id'])
+            id_route_cache.set(f"cv:{cvid_int}", {"kind": "opus", "id": opus_id})
+            id_route_cache.set(f"opus:{opus_id}", {"kind": "dynamic"})
+            return await _follow_route(get_opus_detail, opus_id, group_id)
+        if text.get('fetched'):
+            id_route_cache.set(f"cv:{cvid_int}", {"kind": "article"})
+        summary = text.get('summary') or ''
+        author_face, avatar_focus = enriched.get('author') or (None, None)
+
+        info['summary'] = summary[:ARTICLE_SUMMARY_LIMIT] if summary else '点击查看详情'
+        info['html_content'] = text.get('html_content') or ''
+
+        info['author_face'] = author_face  # 添加作者头像
+
         info['focus'] = {
-            "cover": await get_image_focus_color(cover),
-            "avatar": await get_image_focus_color(author_face)
+            "cover": enriched.get('cover_focus'),
+            "avatar": avatar_focus
         }
 
         # Map publish_time if missing (Article API varies)
@@ -363,9 +1322,13 @@ async def get_live_room_info(room_id, group_id=None):
         anchor_info = info.get('anchor_info', {}).get('base_info', {})
         cover_url = room_info.get('cover') or ''
         avatar_url = anchor_info.get('face') or ''
+        focus = await run_enrichments({
+            "cover": get_image_focus_color(cover_url),
+            "avatar": get_image_focus_color(avatar_url),
+        })
         info['focus'] = {
-            "cover": await get_image_focus_color(cover_url),
-            "avatar": await get_image_focus_color(avatar_url)
+            "cover": focus.get('cover'),
+            "avatar": focus.get('avatar')
         }
         return {"status": "success", "type": "live", "data": info}
     except Exception as e:
@@ -407,122 +1370,350 @@ async def poll_login(qrcode_key, group_id=None):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-async def get_user_dynamic(uid, group_id=None):
+# 作者资料缓存：等级、头像框、装扮卡片很少变化，按 UID 缓存，避免每次轮询都额外请求两个接口
+AUTHOR_PROFILE_TTL = int(os.environ.get('BILI_AUTHOR_PROFILE_TTL', 24 * 3600))
+# 常驻模式下的后台刷新间隔（秒），0 表示关闭；每轮刷新已超过半个 TTL 的条目
+AUTHOR_PROFILE_REFRESH_INTERVAL = int(os.environ.get('BILI_AUTHOR_PROFILE_REFRESH', 0))
+AUTHOR_PROFILE_REFRESH_BATCH = 20
+author_profile_cache = TwoTierCache('author_profile', AUTHOR_PROFILE_TTL, max_memory=2048, max_disk=50000)
+
+async def get_author_profile(uid, credential=None, refresh=False):
+    """
+    获取作者的等级、头像框与装扮卡片地址：{"level", "pendant_url", "card_url"}。
+    两个接口都成功时才写入缓存；部分失败时返回已获取到的字段。
+    """
+    key = str(uid)
+    if not refresh:
+        cached = author_profile_cache.get(key)
+        if cached is not None:
+            return cached
+
+    u = user.User(uid=int(uid), credential=credential)
+    results = await asyncio.gather(u.get_user_info(), u.get_user_profile(), return_exceptions=True)
+    # 取消等 BaseException 由 _collect_results 继续抛出，普通异常视为该接口失败
+    fetched = _collect_results(("base", "profile"), results, None)
+    base, profile = fetched.get("base"), fetched.get("profile")
+    result = {"level": 0, "pendant_url": None, "card_url": None}
+    if "base" in fetched:
+        result["level"] = base.get('level', 0)
+    if "profile" in fetched:
+        # 头像挂件/头像框
+        # 常见结构：profile['pendant']['image'] 或 profile['decorate']['pendant']['image']
+        result["pendant_url"] = (
+            (profile.get('pendant') or {}).get('image') or
+            ((profile.get('decorate') or {}).get('pendant') or {}).get('image')
+        )
+        # 动态卡片（购买的装扮卡片）
+        # 常见结构：profile['decorate']['card_url'] 或 profile['decorate_card']['image']
+        result["card_url"] = (
+            (profile.get('decorate') or {}).get('card_url') or
+            (profile.get('decorate_card') or {}).get('image')
+        )
+    if len(fetched) == 2:
+        author_profile_cache.set(key, result)
+    return result
+
+async def refresh_author_profiles():
+    # 后台慢速刷新：逐个更新即将过期的作者资料，避免集中请求
+    while True:
+        await asyncio.sleep(AUTHOR_PROFILE_REFRESH_INTERVAL)
+        for uid in author_profile_cache.stale_keys(AUTHOR_PROFILE_TTL / 2, AUTHOR_PROFILE_REFRESH_BATCH):
+            try:
+                await get_author_profile(uid, load_credential(), refresh=True)
+            except:
+                pass
+            await asyncio.sleep(1)
+
+def _dynamic_pub_ts(item):
+    # 不同的动态类型，时间字段位置可能不同，通常在 modules.module_author.pub_ts
     try:
-        u = user.User(uid=int(uid), credential=load_credential(group_id))
+        return int(((item.get('modules') or {}).get('module_author') or {}).get('pub_ts', 0) or 0)
+    except:
+        return 0
+
+# 一次轮询最多返回的新动态数量（长时间未轮询后避免刷屏）
+DYNAMIC_BURST_LIMIT = 10
+
+async def _enrich_user_dynamic(item, uid, credential):
+    pub_ts = _dynamic_pub_ts(item)
+
+    # 从动态本身的作者模块获取头像框与装扮卡片
+    decoration_card = None
+    card_number = None
+    fan_color = None  # 初始化 fan_color
+    ma = {}
+    try:
+        ma = (item.get('modules') or {}).get('module_author') or {}
+        if 'decoration_card' in ma and ma['decoration_card']:
+            decoration_card = ma['decoration_card']
+            card_number = (
+                decoration_card.get('card_number') or
+                decoration_card.get('fan_card_no') or
+                decoration_card.get('card_no') or
+                decoration_card.get('serial') or
+                None
+            )
+            # 获取粉丝牌颜色信息
+            fan_info = decoration_card.get('fan', {})
+            fan_color = fan_info.get('color') if fan_info else None
+    except:
+        pass
+
+    async def load_profile():
+        profile = {}
+        try:
+            profile = await get_author_profile(uid, credential)
+        except:
+            pass
+        # 卡片主色依赖 profile 中的卡片地址，没有时使用动态自带的装扮卡片
+        src = profile.get('card_url') or ((decoration_card or {}).get('card_url'))
+        card_focus_color = await get_image_focus_color(src) if src else None
+        return profile.get('level', 0), profile.get('pendant_url'), profile.get('card_url'), card_focus_color
+
+    # 获取作者扩展信息：等级、头像框、动态卡片（若可用，优先读缓存），与头像主色并发获取
+    author_face_url = ma.get('face') or (item.get('author') or {}).get('face') or ''
+    enriched = await run_enrichments({
+        "profile": load_profile(),
+        "avatar_focus_color": get_image_focus_color(author_face_url),
+    })
+    author_level, pendant_url, card_url, card_focus_color = enriched.get('profile') or (0, None, None, None)
+    # 从动态本身的作者模块尝试补充头像框
+    pendant_url = pendant_url or ((ma.get('pendant') or {}).get('image'))
+    avatar_focus_color = enriched.get('avatar_focus_color')
+
+    return {
+        "id": item.get('id_str'),
+        "type": item.get('type'),
+        "modules": item.get('modules'),
+        "orig": item.get('orig'), # 转发动态的原始内容
+        "pub_ts": pub_ts,  # 新增发布时间戳
+        "author": {
+            "level": author_level,
+            "pendant_url": pendant_url,
+            "card_url": card_url,
+            "decoration_card": decoration_card,
+            "card_number": card_number,
+            "card_focus_color": card_focus_color,
+            "fan_color": fan_color,
+            "avatar_focus_color": avatar_focus_color
+        }
+    }
+
+async def get_user_dynamic(uid, group_id=None, last_id=None, last_ts=None):
+    """
+    获取 UP 的最新动态。
+    传入上次已处理的 last_id / last_ts 时：没有更新的动态则直接返回 {"unchanged": True} 的精简结果，
+    不做任何补充请求；有多条新动态时 data 仍为最新一条，data.items 按时间从旧到新列出全部新动态。
+    """
+    try:
+        credential = load_credential(group_id)
+        u = user.User(uid=int(uid), credential=credential)
         # 使用新的 get_dynamics_new 接口
         dynamics = await u.get_dynamics_new(offset="")
         if dynamics and 'items' in dynamics and len(dynamics['items']) > 0:
+            items = dynamics['items']
             latest = None
             max_ts = -1
             
             # Check top 5 items to find the latest by timestamp (handling pinned posts)
-            for item in dynamics['items'][:5]:
-                ts = 0
-                try:
-                    if 'modules' in item and 'module_author' in item['modules']:
-                        ts = int(item['modules']['module_author'].get('pub_ts', 0))
-                except:
-                    pass
-                
+            for item in items[:5]:
+                ts = _dynamic_pub_ts(item)
                 if ts > max_ts:
                     max_ts = ts
                     latest = item
 
-            if not latest and len(dynamics['items']) > 0:
-                latest = dynamics['items'][0]
+            if not latest and len(items) > 0:
+                latest = items[0]
 
             if not latest:
                  return {"status": "success", "data": None}
             
             # 获取发布时间 (pub_time)
-            # 不同的动态类型，时间字段位置可能不同，通常在 modules.module_author.pub_ts
-            pub_ts = 0
-            if 'modules' in latest and 'module_author' in latest['modules']:
-                pub_ts = latest['modules']['module_author'].get('pub_ts', 0)
-            
-            # 获取作者扩展信息：等级、头像框、动态卡片（若可用）
-            author_level = 0
-            pendant_url = None
-            card_url = None
-            decoration_card = None
-            card_number = None
-            fan_color = None  # 初始化 fan_color
-            try:
-                info = await u.get_user_info()
-                author_level = info.get('level', 0)
-            except:
-                author_level = 0
-            try:
-                profile = await u.get_user_profile()
-                # 头像挂件/头像框
-                # 常见结构：profile['pendant']['image'] 或 profile['decorate']['pendant']['image']
-                pendant_url = (
-                    (profile.get('pendant') or {}).get('image') or
-                    ((profile.get('decorate') or {}).get('pendant') or {}).get('image')
-                )
-                # 动态卡片（购买的装扮卡片）
-                # 常见结构：profile['decorate']['card_url'] 或 profile['decorate_card']['image']
-                card_url = (
-                    (profile.get('decorate') or {}).get('card_url') or
-                    (profile.get('decorate_card') or {}).get('image')
-                )
-            except:
-                pass
-            # 从动态本身的作者模块尝试补充头像框
-            try:
-                ma = (latest.get('modules') or {}).get('module_author') or {}
-                pendant_url = pendant_url or ((ma.get('pendant') or {}).get('image'))
-                if 'decoration_card' in ma and ma['decoration_card']:
-                    decoration_card = ma['decoration_card']
-                    card_number = (
-                        decoration_card.get('card_number') or
-                        decoration_card.get('fan_card_no') or
-                        decoration_card.get('card_no') or
-                        decoration_card.get('serial') or
-                        None
-                    )
-                    # 获取粉丝牌颜色信息
-                    fan_info = decoration_card.get('fan', {})
-                    fan_color = fan_info.get('color') if fan_info else None
-            except:
-                pass
-            card_focus_color = None
-            avatar_focus_color = None
-            try:
-                src = card_url or ((decoration_card or {}).get('card_url'))
-                card_focus_color = await get_image_focus_color(src) if src else None
-            except:
-                card_focus_color = None
-            try:
-                author_face_url = ma.get('face') or (latest.get('author') or {}).get('face') or ''
-                avatar_focus_color = await get_image_focus_color(author_face_url) if author_face_url else None
-            except:
-                avatar_focus_color = None
-            
-            return {"status": "success", "data": {
-                "id": latest.get('id_str'),
-                "type": latest.get('type'),
-                "modules": latest.get('modules'),
-                "orig": latest.get('orig'), # 转发动态的原始内容
-                "pub_ts": pub_ts,  # 新增发布时间戳
-                "author": {
-                    "level": author_level,
-                    "pendant_url": pendant_url,
-                    "card_url": card_url,
-                    "decoration_card": decoration_card,
-                    "card_number": card_number,
-                    "card_focus_color": card_focus_color,
-                    "fan_color": fan_color,
-                    "avatar_focus_color": avatar_focus_color
-                }
-            }}
+            pub_ts = _dynamic_pub_ts(latest)
+
+            # 计算游标：优先使用时间戳，只有 ID 时从本页中找到对应动态的时间
+            since_ts = None
+            if last_ts not in (None, '', 'None'):
+                try:
+                    since_ts = int(float(last_ts))
+                except:
+                    since_ts = None
+            if since_ts is None and last_id:
+                for item in items:
+                    if str(item.get('id_str')) == str(last_id):
+                        since_ts = _dynamic_pub_ts(item)
+                        break
+
+            # 最新动态就是上次已处理的动态（或不比游标新）时，跳过作者信息与主色等补充请求
+            if (last_id and str(latest.get('id_str')) == str(last_id)) or (since_ts is not None and pub_ts <= since_ts):
+                return {"status": "success", "data": {
+                    "id": latest.get('id_str'),
+                    "type": latest.get('type'),
+                    "pub_ts": pub_ts,
+                    "unchanged": True
+                }}
+
+            # 需要推送的动态：有游标时为本页中所有比游标新的动态，否则只取最新一条
+            if since_ts is not None:
+                fresh = [
+                    item for item in items
+                    if _dynamic_pub_ts(item) > since_ts and str(item.get('id_str')) != str(last_id)
+                ]
+                fresh.sort(key=_dynamic_pub_ts)
+                fresh = fresh[-DYNAMIC_BURST_LIMIT:]
+            else:
+                fresh = [latest]
+
+            # 只对将要推送的动态做补充请求（作者资料走缓存，多条之间并发）
+            enriched = await asyncio.gather(*(_enrich_user_dynamic(item, uid, credential) for item in fresh))
+            data = dict(enriched[-1])
+            if since_ts is not None:
+                data["items"] = list(enriched)
+            return {"status": "success", "data": data}
         return {"status": "success", "data": None}
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
 
+# 批量检查动态的默认并发数
+BATCH_CONCURRENCY = int(os.environ.get('BILI_BATCH_CONCURRENCY', 8))
+
+async def get_user_dynamic_batch(items, concurrency=None):
+    """
+    批量检查多个 UP 的最新动态。items 为 [{"uid", "group_id"?, "last_id"?, "last_ts"?}]，
+    在并发上限内同时请求，每个 UID 完成后立即通过 emit_item 输出 {"uid", "result"}。
+    """
+    try:
+        entries = _load_batch_items(items)
+        semaphore = asyncio.Semaphore(max(1, int(concurrency or BATCH_CONCURRENCY)))
+        streaming = _stream_emit.get() is not None
+        collected = []
+
+        async def check(entry):
+            uid = entry.get('uid')
+            async with semaphore:
+                result = await get_user_dynamic(uid, entry.get('group_id'), entry.get('last_id'), entry.get('last_ts'))
+            item = {"uid": uid, "result": result}
+            if streaming:
+                await emit_item(item)
+            else:
+                collected.append(item)
+            return result
+
+        results = await asyncio.gather(*(check(entry) for entry in entries))
+        data = {
+            "count": len(entries),
+            "errors": sum(1 for r in results if r.get('status') != 'success')
+        }
+        if not streaming:
+            data["items"] = collected
+        return {"status": "success", "type": "user_dynamic_batch", "data": data}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# 关注动态流轮询：一次请求即可发现账号关注的所有 UP 的新动态
+# 每个凭据文件记录一个 update_baseline（上次看到的最新动态 ID）
+FEED_UPDATE_URL = "https://api.bilibili.com/x/polymer/web-dynamic/v1/feed/all/update"
+FEED_MAX_PAGES = 5
+feed_baseline_cache = TwoTierCache('feed_baseline', 90 * 24 * 3600, max_memory=64, max_disk=1000)
+
+def _dynamic_id_int(item):
+    try:
+        return int(item.get('id_str') or 0)
+    except:
+        return 0
+
+async def get_feed_poll(group_id=None, max_pages=None):
+    """
+    读取凭据账号的关注动态流，只返回上次轮询之后的新动态，按作者 mid 分组（每组从旧到新，格式同 get_user_dynamic）。
+    首次调用只记录基线不返回动态；没有更新时只请求一次 update 接口。
+    新动态超过 max_pages 页（未翻到上次的基线）时返回 truncated，调用方应改为逐个 UID 检查；
+    基线照常推进到最新动态，下次轮询只需覆盖此后的新动态（逐个 UID 检查有各自的游标，不会漏掉中间的动态）。
+    动态流只覆盖该账号关注的 UP，调用方对其余 UID 仍需单独轮询。
+    """
+    try:
+        credential = load_credential(group_id)
+        if credential is None or not credential.sessdata:
+            return {"status": "error", "message": "关注动态流需要登录凭据"}
+        state_key = get_credential_file(group_id)
+        state = feed_baseline_cache.get(state_key) or {}
+        baseline = state.get('baseline')
+
+        # 有基线时先询问是否有更新，没有则直接返回
+        if baseline:
+            api = bili_network.Api(FEED_UPDATE_URL, method="GET", credential=credential)
+            api.update_params(type="all", update_baseline=baseline)
+            update = await api.result
+            if not int((update or {}).get('update_num') or 0):
+                return {"status": "success", "type": "feed_poll", "data": {"unchanged": True, "authors": {}, "count": 0}}
+
+        baseline_int = int(baseline) if baseline else 0
+        fresh = []
+        new_baseline = None
+        offset = None
+        truncated = False
+        for pn in range(1, int(max_pages or FEED_MAX_PAGES) + 1):
+            page = await dynamic.get_dynamic_page_info(credential, _type=dynamic.DynamicType.ALL, pn=pn, offset=offset)
+            items = (page or {}).get('items') or []
+            if new_baseline is None:
+                new_baseline = (page or {}).get('update_baseline') or (items[0].get('id_str') if items else None)
+            # 首次轮询只记录基线
+            if not baseline_int:
+                break
+            reached = False
+            for item in items:
+                if _dynamic_id_int(item) <= baseline_int:
+                    reached = True
+                    break
+                fresh.append(item)
+            if reached or not page.get('has_more'):
+                break
+            offset = page.get('offset')
+        else:
+            # 翻到页数上限仍未到达旧基线：中间还有没取到的动态，本轮不返回动态，由调用方改为逐个 UID 检查
+            truncated = bool(baseline_int)
+
+        # 截断时同样推进基线，否则之后每次轮询都会因为同一段积压而截断
+        if new_baseline:
+            feed_baseline_cache.set(state_key, {"baseline": str(new_baseline), "updated_at": int(time.time())})
+        if truncated:
+            return {"status": "success", "type": "feed_poll", "data": {
+                "truncated": True, "authors": {}, "count": 0
+            }}
+
+        # 按作者分组，每个作者最多保留最近 DYNAMIC_BURST_LIMIT 条，只对这些动态做补充请求
+        grouped = {}
+        for item in fresh:
+            mid = ((item.get('modules') or {}).get('module_author') or {}).get('mid')
+            if mid:
+                grouped.setdefault(str(mid), []).append(item)
+        for mid, items in grouped.items():
+            items.sort(key=_dynamic_pub_ts)
+            grouped[mid] = items[-DYNAMIC_BURST_LIMIT:]
+
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def enrich(mid, item):
+            async with semaphore:
+                return await _enrich_user_dynamic(item, mid, credential)
+
+        pairs = [(mid, item) for mid, items in grouped.items() for item in items]
+        enriched = await asyncio.gather(*(enrich(mid, item) for mid, item in pairs))
+        authors = {}
+        for (mid, _), data in zip(pairs, enriched):
+            authors.setdefault(mid, []).append(data)
+
+        return {"status": "success", "type": "feed_poll", "data": {
+            "initialized": not baseline_int,
+            "authors": authors,
+            "count": sum(len(v) for v in authors.values())
+        }}
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"status": "error", "message": str(e)}
+
 async def get_user_live(uid, group_id=None):
     try:
         u = user.User(uid=int(uid), credential=load_credential(group_id))
@@ -544,8 +1735,121 @@ async def get_user_live(uid, group_id=None):
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
 
+# 批量查询直播状态：一次请求可查询多个 UID 的直播间
+LIVE_STATUS_BY_UIDS_URL = "https://api.live.bilibili.com/room/v1/Room/get_status_info_by_uids"
+LIVE_STATUS_CHUNK = 100
+
+def _normalize_live_room(room):
+    # 与 get_user_live 中 live_room 的兼容字段保持一致
+    return {
+        "room_id": room.get('room_id') or room.get('roomid'),
+        "live_status": room.get('live_status', room.get('liveStatus', 0)),
+        "title": room.get('title', ''),
+        "cover": room.get('cover_from_user') or room.get('cover') or '',
+        "uname": room.get('uname', ''),
+        "live_time": room.get('live_time', 0),
+    }
+
+async def get_live_status_batch(uids, group_id=None):
+    """
+    批量获取多个 UP 的直播状态。uids 为 UID 列表（JSON 字符串、"-" 或列表）。
+    返回 {uid: {"room_id", "live_status", "title", ...}}，没有直播间的 UID 的 room_id 为 None；
+    请求失败的分片中的 UID 列在 failed 中，调用方可对其单独查询。
+    """
+    try:
+        uid_list = []
+        for entry in _load_batch_items(uids):
+            uid = str(entry.get('uid') or '').strip()
+            if uid.isdigit() and uid not in uid_list:
+                uid_list.append(uid)
+        cred = load_credential(group_id)
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        rooms = {}
+        failed = []
+
+        async def fetch_chunk(chunk):
+            async with semaphore:
+                try:
+                    api = bili_network.Api(LIVE_STATUS_BY_UIDS_URL, method="POST", json_body=True, no_csrf=True, credential=cred)
+                    api.update_data(uids=[int(uid) for uid in chunk])
+                    res = await api.result
+                except Exception as e:
+                    print(f"Error fetching live status for {len(chunk)} uids: {e}", file=sys.stderr)
+                    failed.extend(chunk)
+                    return
+            # 没有任何直播间时接口返回空列表
+            found = res if isinstance(res, dict) else {}
+            for uid in chunk:
+                room = found.get(uid)
+                if room:
+                    rooms[uid] = _normalize_live_room(room)
+                else:
+                    rooms[uid] = {"room_id": None, "live_status": 0, "title": ''}
+
+        chunks = [uid_list[i:i + LIVE_STATUS_CHUNK] for i in range(0, len(uid_list), LIVE_STATUS_CHUNK)]
+        await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        return {"status": "success", "type": "live_status_batch", "data": {
+            "rooms": rooms,
+            "failed": failed,
+            "requests": len(chunks)
+        }}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+# 投票信息：同一条投票动态推送到多个群时复用，参与人数变化较快，只缓存几分钟
+VOTE_CACHE_TTL = 300
+vote_cache = TwoTierCache('vote', VOTE_CACHE_TTL, max_memory=256, max_disk=5000)
+
+def normalize_vote_info(vinfo):
+    """
+    把投票接口的返回值整理为渲染端使用的字段：{"items": [{"desc", "image", "cnt"}], "join_num", "choice_cnt", "title", "desc"}。
+    选项可能位于 info.options、data.choices 或 choices 下；缺失的字段为 None。
+    """
+    vinfo = vinfo if isinstance(vinfo, dict) else {}
+    info = vinfo.get('info') if isinstance(vinfo.get('info'), dict) else {}
+    data = vinfo.get('data') if isinstance(vinfo.get('data'), dict) else {}
+
+    def pick(info_key, key):
+        return info.get(info_key) or data.get(key) or vinfo.get(key)
+
+    items = []
+    for choice in info.get('options') or data.get('choices') or vinfo.get('choices') or []:
+        if isinstance(choice, dict):
+            items.append({"desc": choice.get('desc') or '', "image": choice.get('image'), "cnt": choice.get('cnt')})
+        else:
+            items.append({"desc": str(choice), "image": None, "cnt": 0})
+    return {
+        "items": items,
+        "join_num": pick('cnt', 'join_num'),
+        "choice_cnt": pick('choice_cnt', 'choice_cnt'),
+        "title": pick('title', 'title'),
+        "desc": pick('desc', 'desc'),
+    }
+
+def merge_vote_info(vote_obj, normalized):
+    # 动态卡片自带的投票字段作为后备，接口没有返回的字段不覆盖
+    merged = {"items": normalized.get('items') or []}
+    for key in ("join_num", "choice_cnt", "title", "desc"):
+        value = normalized.get(key) or vote_obj.get(key)
+        if value is not None:
+            merged[key] = value
+    return merged
+
+async def get_vote_info(vote_id, credential=None):
+    key = str(int(vote_id))
+    cached = vote_cache.get(key)
+    if cached is not None:
+        return cached
+    vinfo = await vote.Vote(vote_id=int(vote_id), credential=credential).get_info()
+    normalized = normalize_vote_info(vinfo)
+    vote_cache.set(key, normalized)
+    return normalized
+
 async def get_dynamic_detail(dynamic_id, group_id=None):
     try:
+        route = id_route_cache.get(f"dyn:{int(dynamic_id)}")
+        if route and route.get('kind') == 'opus':
+            return await _follow_route(get_opus_detail, route['id'], group_id)
         d = dynamic.Dynamic(int(dynamic_id), credential=load_credential(group_id))
         info = await d.get_info()
 
@@ -563,9 +1867,10 @@ async def get_dynamic_detail(dynamic_id, group_id=None):
             jump_url = basic.get('jump_url', '')
             if '/opus/' in jump_url:
                 opus_match = re.search(r'/opus/(\d+)', jump_url)
-                if opus_match:
-                    opus_id = opus_match.group(1)
-                    return await get_opus_detail(opus_id, group_id)
+                if opus_match and int(opus_match.group(1)) != int(dynamic_id):
+                    opus_id = int(opus_match.group(1))
+                    id_route_cache.set(f"dyn:{int(dynamic_id)}", {"kind": "opus", "id": opus_id})
+                    return await _follow_route(get_opus_detail, opus_id, group_id)
 
             return {"status": "error", "message": f"动态 {dynamic_id} 的数据结构异常，可能已被删除"}
 
@@ -609,35 +1914,40 @@ async def get_dynamic_detail(dynamic_id, group_id=None):
             # 有些情况下等级信息可能在pendant中
             pass
 
-        # 如果上面没有获取到装饰信息或等级，再尝试通过用户API获取
-        if (not pendant_url or not card_url or author_level == 0) and author_uid:
-            try:
-                u = user.User(uid=int(author_uid), credential=load_credential())
-                base = await u.get_user_info()
-                author_level = base.get('level', author_level)  # 保持之前获取到的等级，如果获取不到则使用之前的值
-                profile = await u.get_user_profile()
-                pendant_url = pendant_url or (
-                    (profile.get('pendant') or {}).get('image') or
-                    ((profile.get('decorate') or {}).get('pendant') or {}).get('image')
-                )
-                card_url = card_url or (
-                    (profile.get('decorate') or {}).get('card_url') or
-                    (profile.get('decorate_card') or {}).get('image')
-                )
-            except:
-                pass
-        card_focus_color = None
-        avatar_focus_color = None
-        try:
-            src = card_url or ((decoration_card or {}).get('card_url'))
-            card_focus_color = await get_image_focus_color(src) if src else None
-        except:
+        async def load_user_decoration():
+            # 如果上面没有获取到装饰信息或等级，再尝试通过用户API获取
+            level = author_level
+            pendant = pendant_url
+            card = card_url
+            if (not pendant or not card or level == 0) and author_uid:
+                try:
+                    profile = await get_author_profile(author_uid, load_credential())
+                    level = profile.get('level') or level  # 保持之前获取到的等级，如果获取不到则使用之前的值
+                    pendant = pendant or profile.get('pendant_url')
+                    card = card or profile.get('card_url')
+                except:
+                    pass
+            # 卡片主色依赖上面补全后的卡片地址
+            src = card or ((decoration_card or {}).get('card_url'))
+            card_focus = await get_image_focus_color(src) if src else None
+            return level, pendant, card, card_focus
+
+        avatar_url = author_module.get('face') or ''
+        tasks = {
+            "decoration": load_user_decoration(),
+            "avatar_focus_color": get_image_focus_color(avatar_url),
+        }
+        additional = ((modules.get('module_dynamic') or {}).get('additional')) or {}
+        vote_obj = additional.get('vote') if isinstance(additional.get('vote'), dict) else None
+        if vote_obj and vote_obj.get('vote_id'):
+            tasks["vote"] = get_vote_info(vote_obj['vote_id'], load_credential(group_id))
+        enriched = await run_enrichments(tasks)
+        vote_info = enriched.get('vote')
+        if 'decoration' in enriched:
+            author_level, pendant_url, card_url, card_focus_color = enriched['decoration']
+        else:
             card_focus_color = None
-        try:
-            avatar_url = author_module.get('face') or ''
-            avatar_focus_color = await get_image_focus_color(avatar_url) if avatar_url else None
-        except:
-            avatar_focus_color = None
+        avatar_focus_color = enriched.get('avatar_focus_color')
 
         author_obj = {
             "level": author_level,
@@ -655,58 +1965,9 @@ async def get_dynamic_detail(dynamic_id, group_id=None):
                 info['item']['author'] = author_obj
         except:
             pass
-        # Enrich vote info (if present) using bilibili_api.vote by vote_id
-        try:
-            mods = (info.get('item') or {}).get('modules') or info.get('modules') or {}
-            md = mods.get('module_dynamic') or {}
-            additional = md.get('additional') or {}
-            vobj = additional.get('vote') or {}
-            vote_id = vobj.get('vote_id')
-            if vote_id:
-                from bilibili_api import vote as vote_api
-                vv = vote_api.Vote(vote_id=int(vote_id), credential=load_credential())
-                vinfo = await vv.get_info()
-                # Normalize to expected fields for Node renderer
-                # choices may reside under data['choices'] or info['options'] or similar
-                items = []
-                try:
-                    # Priority: info.options (seen in debug) -> data.choices -> choices
-                    choices = (vinfo.get('info') or {}).get('options') or vinfo.get('data', {}).get('choices') or vinfo.get('choices') or []
-                except:
-                    choices = []
-                for ch in choices:
-                    # support both dict and tuple-like entries
-                    desc = (ch.get('desc') if isinstance(ch, dict) else str(ch)) or ''
-                    img = (ch.get('image') if isinstance(ch, dict) else None)
-                    cnt = (ch.get('cnt') if isinstance(ch, dict) else 0)
-                    items.append({"desc": desc, "image": img, "cnt": cnt})
-                
-                # Join num and choice cnt
-                join_num = (vinfo.get('info') or {}).get('cnt') or vinfo.get('data', {}).get('join_num') or vinfo.get('join_num') or vobj.get('join_num')
-                choice_cnt = (vinfo.get('info') or {}).get('choice_cnt') or vinfo.get('data', {}).get('choice_cnt') or vinfo.get('choice_cnt') or vobj.get('choice_cnt')
-                title = (vinfo.get('info') or {}).get('title') or vinfo.get('data', {}).get('title') or vinfo.get('title') or vobj.get('title')
-                desc = (vinfo.get('info') or {}).get('desc') or vinfo.get('data', {}).get('desc') or vinfo.get('desc') or vobj.get('desc')
-                # Attach normalized fields back to structure
-                vobj['items'] = items
-                if join_num is not None:
-                    vobj['join_num'] = join_num
-                if choice_cnt is not None:
-                    vobj['choice_cnt'] = choice_cnt
-                if title is not None:
-                    vobj['title'] = title
-                if desc is not None:
-                    vobj['desc'] = desc
-                # write back
-                additional['vote'] = vobj
-                md['additional'] = additional
-                mods['module_dynamic'] = md
-                # Update both places (item.modules and top-level modules) for robustness
-                if isinstance(info.get('item'), dict):
-                    info['item']['modules'] = mods
-                info['modules'] = mods
-        except Exception:
-            # ignore enrichment errors
-            pass
+        # 投票卡片：用投票接口的完整数据补全选项与参与人数（与作者信息并发获取）
+        if vote_info is not None:
+            vote_obj.update(merge_vote_info(vote_obj, vote_info))
         return {"status": "success", "type": "dynamic", "data": info}
     except Exception as e:
         import traceback
@@ -715,74 +1976,15 @@ async def get_dynamic_detail(dynamic_id, group_id=None):
 
 async def get_ep_info(ep_id, group_id=None):
     try:
-        # 使用Episode类获取EP信息
-        ep = bangumi.Episode(int(ep_id), credential=load_credential(group_id))
-        info, _ = await ep.get_episode_info()  # 获取信息和数据类型，但只使用信息
-
-        # 获取对应的番剧信息
-        bangumi_info = await ep.get_bangumi_from_episode()
-        bangumi_overview = await bangumi_info.get_overview()
-        bangumi_stat = await bangumi_info.get_stat()
-
-        # 组合信息
-        data = {
-            "title": bangumi_overview.get('title', ''),
-            "cover": bangumi_overview.get('cover', ''),
-            "desc": bangumi_overview.get('evaluate', ''),
-            "stat": bangumi_stat,
-            "rating": bangumi_overview.get('rating', {}),
-            "styles": bangumi_overview.get('styles', []),
-            "areas": bangumi_overview.get('areas', []),
-            "publish": bangumi_overview.get('publish', {}),
-            "season_id": bangumi_overview.get('season_id'),
-            "season_type": bangumi_overview.get('season_type'),
-            "type_desc": bangumi_overview.get('type_desc'),
-            "series": bangumi_overview.get('series', {}),
-            "new_ep": bangumi_overview.get('new_ep', {}),
-            "ep_id": ep_id
-        }
+        data = await resolve_bangumi(ep_id=ep_id, group_id=group_id)
+        data["ep_id"] = ep_id
         return {"status": "success", "type": "bangumi", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
 async def get_media_info(media_id, group_id=None):
     try:
-        # 使用media_id获取番剧信息
-        b = bangumi.Bangumi(media_id=int(media_id), credential=load_credential(group_id))
-
-        # 获取番剧概览信息
-        overview = await b.get_overview()
-
-        # 获取统计信息
-        try:
-            stat = await b.get_stat()
-        except:
-            stat = {}
-
-        # 获取额外详情
-        try:
-            detail = await b.get_detail()
-        except:
-            detail = {}
-
-        # 组合信息
-        data = {
-            "title": overview.get('title', ''),
-            "cover": overview.get('cover', ''),
-            "desc": overview.get('evaluate', ''),
-            "stat": stat,
-            "new_ep": overview.get('new_ep', {}),
-            "rating": overview.get('rating', {}),
-            "styles": overview.get('styles', []),
-            "areas": overview.get('areas', []),
-            "publish": overview.get('publish', {}),
-            "season_id": overview.get('season_id', ''),
-            "series": overview.get('series', {}),
-            "detail": detail,
-            "focus": {
-                "cover": await get_image_focus_color(overview.get('cover', ''))
-            }
-        }
+        data = await resolve_bangumi(media_id=media_id, group_id=group_id)
         return {"status": "success", "type": "bangumi", "data": data}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -804,27 +2006,14 @@ async def get_user_info(uid, group_id=None):
     try:
         u = user.User(uid=int(uid), credential=load_credential(group_id))
 
-        # 获取用户基本信息
-        user_info = await u.get_user_info()
-
-        # 获取关系信息 (粉丝数/关注数)
-        try:
-            relation = await u.get_relation_info()
-        except:
-            relation = {}
-
-        # 获取统计信息 (获赞/播放)
-        try:
+        async def load_up_stat():
+            # 获取统计信息 (获赞/播放)
             up_stat = await u.get_up_stat()
-            likes = up_stat.get('likes', 0)
-            archive_view = up_stat.get('archive', {}).get('view', 0)
-        except:
-            likes = 0
-            archive_view = 0
+            return up_stat.get('likes', 0), up_stat.get('archive', {}).get('view', 0)
 
-        # 获取最新动态 (使用 get_dynamics_new)
-        latest_dynamic = None
-        try:
+        async def load_latest_dynamic():
+            # 获取最新动态 (使用 get_dynamics_new)
+            latest_dynamic = None
             dynamics = await u.get_dynamics_new(offset="")
             if dynamics and 'items' in dynamics and len(dynamics['items']) > 0:
                 max_ts = -1
@@ -835,15 +2024,37 @@ async def get_user_info(uid, group_id=None):
                             ts = int(item['modules']['module_author'].get('pub_ts', 0))
                     except:
                         pass
-                    
+
                     if ts > max_ts:
                         max_ts = ts
                         latest_dynamic = item
 
                 if not latest_dynamic:
                     latest_dynamic = dynamics['items'][0]
-        except:
-            pass
+            return latest_dynamic
+
+        async def load_avatar_focus():
+            info = await user_info_task
+            return await get_image_focus_color(info.get('face', ''))
+
+        # 基本信息、关系、统计、最新动态并发获取；头像主色只依赖基本信息
+        user_info_task = asyncio.ensure_future(u.get_user_info())
+        errors = {}
+        enriched = await run_enrichments({
+            "user_info": user_info_task,
+            "relation": u.get_relation_info(),
+            "up_stat": load_up_stat(),
+            "dynamic": load_latest_dynamic(),
+            "avatar_focus": load_avatar_focus(),
+        }, errors=errors)
+
+        # 获取用户基本信息失败时整体失败
+        if 'user_info' not in enriched:
+            raise errors['user_info']
+        user_info = enriched['user_info']
+        relation = enriched.get('relation', {})
+        likes, archive_view = enriched.get('up_stat', (0, 0))
+        latest_dynamic = enriched.get('dynamic')
 
         # 组合信息
         data = {
@@ -860,7 +2071,7 @@ async def get_user_info(uid, group_id=None):
             "archive_view": archive_view,
             "dynamic": latest_dynamic,
             "focus": {
-                "avatar": await get_image_focus_color(user_info.get('face', ''))
+                "avatar": enriched.get('avatar_focus')
             }
         }
 
@@ -868,228 +2079,735 @@ async def get_user_info(uid, group_id=None):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-async def get_my_followings(group_name=None, group_id=None):
+# 关注列表分页：第一页拿到总数后，其余页在并发上限内同时请求
+FOLLOWINGS_PAGE_SIZE = 50
+FOLLOWINGS_MAX_PAGES = 100
+FOLLOWINGS_CONCURRENCY = 4
+RELATION_TAGS_URL = "https://api.bilibili.com/x/relation/tags"
+RELATION_TAG_URL = "https://api.bilibili.com/x/relation/tag"
+
+def _format_following(f):
+    # 统一字段处理
+    # x/relation/tag 返回的字段可能略有不同，但通常也有 mid, uname, face 等
+    uid = f.get('mid')
+    uname = f.get('uname') or f.get('name')
+    if not (uid and uname):
+        return None
+    return {
+        'uid': uid,
+        'name': uname,
+        'face': f.get('face'),
+        'level': 0,
+        'sign': f.get('sign', '')
+    }
+
+async def _paginate_followings(fetch_page, total, first_page, on_records, concurrency=None):
+    """
+    fetch_page(pn) 返回该页的原始用户列表。first_page 为已取得的第一页（为 None 时在这里请求），
+    根据 total 计算剩余页数并发请求，每页完成后立即以格式化后的记录调用 on_records。
+    返回 (记录数, 请求失败的页码列表)。
+    """
+    seen = set()
+    if first_page is None:
+        try:
+            first_page = await fetch_page(1)
+        except Exception as e:
+            print(f"Error fetching followings page 1: {e}", file=sys.stderr)
+            return 0, [1]
+
+    async def deliver(raw):
+        records = []
+        for f in raw or []:
+            record = _format_following(f)
+            if record and record['uid'] not in seen:
+                seen.add(record['uid'])
+                records.append(record)
+        if records:
+            await on_records(records)
+
+    await deliver(first_page)
+    failed = []
+    if not first_page or len(first_page) < FOLLOWINGS_PAGE_SIZE:
+        return len(seen), failed
+
+    pages = min(FOLLOWINGS_MAX_PAGES, -(-int(total) // FOLLOWINGS_PAGE_SIZE)) if total else FOLLOWINGS_MAX_PAGES
+    semaphore = asyncio.Semaphore(max(1, int(concurrency or FOLLOWINGS_CONCURRENCY)))
+    exhausted = False  # 不知道总数时，遇到不满一页即停止后续请求
+
+    async def load(pn):
+        nonlocal exhausted
+        if exhausted:
+            return
+        async with semaphore:
+            if exhausted:
+                return
+            try:
+                raw = await fetch_page(pn)
+            except Exception as e:
+                print(f"Error fetching followings page {pn}: {e}", file=sys.stderr)
+                failed.append(pn)
+                return
+        if not total and (not raw or len(raw) < FOLLOWINGS_PAGE_SIZE):
+            exhausted = True
+        await deliver(raw)
+
+    await asyncio.gather(*(load(pn) for pn in range(2, pages + 1)))
+    return len(seen), failed
+
+async def _open_followings(cred, group_name=None):
+    """
+    准备关注列表的分页读取：返回 (fetch_page, first_page, total, version)。
+    version 为关注列表的版本号（x/relation/followings 的 re_version；指定分组时附加分组人数），
+    分组不存在或分组列表获取失败时抛出 ValueError。
+    指定分组时 first_page 为 None：版本号未变化的调用方无需请求分组的第一页，由 _paginate_followings 按需获取。
+    """
+    # Get self info to find my_uid
+    self_info = await user.get_self_info(credential=cred)
+    my_uid = self_info['mid']
+    u = user.User(uid=my_uid, credential=cred)
+
+    # 获取所有关注：get_followings 返回 {'list', 'total', 're_version'}
+    meta = {"total": 0, "re_version": None}
+
+    async def fetch_all_page(pn):
+        res = await u.get_followings(pn=pn, ps=FOLLOWINGS_PAGE_SIZE)
+        if pn == 1:
+            meta["total"] = (res or {}).get('total', 0)
+            meta["re_version"] = (res or {}).get('re_version')
+        return (res or {}).get('list') or []
+
+    if not group_name:
+        first_page = await fetch_all_page(1)
+        return fetch_all_page, first_page, meta["total"], str(meta["re_version"] or '')
+
+    # 1. 获取所有分组
+    try:
+        groups_api = bili_network.Api(RELATION_TAGS_URL, method="GET", credential=cred)
+        groups = await groups_api.result
+    except Exception as e:
+        raise ValueError(f"获取分组列表失败: {str(e)}")
+
+    target_group = None
+    if groups:
+        for g in groups:
+            if g.get('name') == group_name:
+                target_group = g
+                break
+
+    if not target_group:
+        raise ValueError(f"未找到名为 '{group_name}' 的分组")
+
+    tagid = target_group['tagid']
+    # 分组列表中的 count 即分组人数
+    total = target_group.get('count') or 0
+
+    # 2. 获取分组下的用户（x/relation/tag 直接返回用户列表）
+    async def fetch_page(pn):
+        api = bili_network.Api(RELATION_TAG_URL, method="GET", credential=cred)
+        api.update_params(mid=my_uid, tagid=tagid, pn=pn, ps=FOLLOWINGS_PAGE_SIZE)
+        res = await api.result
+        return res if isinstance(res, list) else []
+
+    # 分组接口没有版本号，用整体关注列表的 re_version 加上分组人数作为版本
+    try:
+        version_res = await u.get_followings(pn=1, ps=1)
+        version = f"{version_res.get('re_version')}:{total}" if version_res.get('re_version') else ''
+    except Exception:
+        version = ''
+
+    return fetch_page, None, total, version
+
+async def get_my_followings(group_name=None, group_id=None, stream=None):
+    """
+    获取当前凭据账号的关注列表（可指定关注分组）。
+    stream 为真时每条 {uid, name, face, sign} 记录通过 emit_item 逐条输出，最终结果只包含数量。
+    有分页请求失败时列表不完整，partial 为 True，failed 为失败的页码。
+    """
     try:
         cred = load_credential(group_id)
         if not cred:
             return {"status": "error", "message": "未登录，请先配置 cookies.json"}
-        
-        # Get self info to find my_uid
-        self_info = await user.get_self_info(credential=cred)
-        my_uid = self_info['mid']
-        u = user.User(uid=my_uid, credential=cred)
-        
-        all_followings = []
-        page = 1
-        page_size = 50
-        
-        if group_name:
-            # 1. 获取所有分组
-            try:
-                groups_api = Api("https://api.bilibili.com/x/relation/tags", method="GET", credential=cred)
-                groups = await groups_api.result
-            except Exception as e:
-                return {"status": "error", "message": f"获取分组列表失败: {str(e)}"}
-            
-            target_group = None
-            if groups:
-                for g in groups:
-                    if g.get('name') == group_name:
-                        target_group = g
-                        break
-            
-            if not target_group:
-                 return {"status": "error", "message": f"未找到名为 '{group_name}' 的分组"}
-            
-            tagid = target_group['tagid']
-            
-            # 2. 获取分组下的用户
-            while True:
-                try:
-                    group_users_api = Api("https://api.bilibili.com/x/relation/tag", method="GET", credential=cred)
-                    group_users_api.update_params(mid=my_uid, tagid=tagid, pn=page, ps=page_size)
-                    res = await group_users_api.result
-                except Exception as e:
-                    # 某些情况下 API 可能报错或返回非标准格式
-                    print(f"Error fetching group users: {e}")
-                    break
+        streaming = stream not in (None, '', '0', 'false', 'None') and _stream_emit.get() is not None
 
-                if not res:
-                    break
-                
-                # The structure of x/relation/tag result is a list of users directly
-                # It doesn't seem to have 'total' field in the root usually?
-                # Actually standard pagination usually needs total.
-                # But 'res' IS the list of users according to my test script output structure (Users in group: [])
-                # Wait, my test script printed: "Users in group: []"
-                # If there were users, it would be a list of dicts.
-                
-                if isinstance(res, list):
-                    current_list = res
-                    if not current_list:
-                        break
-                    all_followings.extend(current_list)
-                    
-                    # If we got fewer items than page_size, we are done
-                    if len(current_list) < page_size:
-                        break
-                else:
-                    break
+        try:
+            fetch_page, first_page, total, _ = await _open_followings(cred, group_name)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
 
-                page += 1
-                if page > 100:
-                    break
-                    
-        else:
-            # 原有逻辑：获取所有关注
-            while True:
-                # get_followings returns a dict with 'list', 'total', 're_version'
-                res = await u.get_followings(pn=page, ps=page_size)
-                if not res or 'list' not in res or not res['list']:
-                    break
-                    
-                followings_list = res['list']
-                all_followings.extend(followings_list)
-                
-                total = res.get('total', 0)
-                if len(all_followings) >= total:
-                    break
-                
-                page += 1
-                if page > 100: 
-                    break
-                
-        # Format the result
         result = []
-        for f in all_followings:
-            # 统一字段处理
-            # x/relation/tag 返回的字段可能略有不同，但通常也有 mid, uname, face 等
-            uid = f.get('mid')
-            uname = f.get('uname') or f.get('name') # tag api might use name? let's assume uname/mid are standard
-            face = f.get('face')
-            sign = f.get('sign', '')
-            
-            if uid and uname:
-                result.append({
-                    'uid': uid,
-                    'name': uname,
-                    'face': face,
-                    'level': 0, 
-                    'sign': sign
-                })
-            
-        return {"status": "success", "type": "user_list", "data": result}
+
+        async def on_records(records):
+            if streaming:
+                for record in records:
+                    await emit_item(record)
+            else:
+                result.extend(records)
+
+        count, failed = await _paginate_followings(fetch_page, total, first_page, on_records)
+        if streaming:
+            return {"status": "success", "type": "user_list", "data": {
+                "count": count, "total": total, "partial": bool(failed), "failed": failed
+            }}
+        return {"status": "success", "type": "user_list", "data": result, "partial": bool(failed), "failed": failed}
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return {"status": "error", "message": str(e)}
+
+# 关注列表快照：每个凭据文件（及分组）保存一份，用于增量同步
+followings_snapshot_cache = TwoTierCache('followings_snapshot', 365 * 24 * 3600, max_memory=16, max_disk=1000)
+
+async def get_followings_diff(group_name=None, group_id=None):
+    """
+    与上次同步时的关注列表快照比较，只返回新增的记录与取消关注的 UID，uids 为快照中的全部 UID。
+    版本号（re_version）未变化时不再分页拉取；首次调用时全部记录视为新增（initial 为 True）。
+    """
+    try:
+        cred = load_credential(group_id)
+        if not cred:
+            return {"status": "error", "message": "未登录，请先配置 cookies.json"}
+        snapshot_key = f"{get_credential_file(group_id)}|{group_name or ''}"
+        snapshot = followings_snapshot_cache.get(snapshot_key)
+
+        try:
+            fetch_page, first_page, total, version = await _open_followings(cred, group_name)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        if snapshot and version and snapshot.get('version') == version:
+            return {"status": "success", "type": "followings_diff", "data": {
+                "unchanged": True,
+                "version": version,
+                "added": [],
+                "removed": [],
+                "uids": list(snapshot.get('users') or {}),
+                "total": len(snapshot.get('users') or {})
+            }}
+
+        current = {}
+
+        async def on_records(records):
+            for record in records:
+                current[str(record['uid'])] = record
+
+        _, failed = await _paginate_followings(fetch_page, total, first_page, on_records)
+
+        previous = (snapshot or {}).get('users') or {}
+        added = [record for uid, record in current.items() if uid not in previous]
+        if failed:
+            # 有分页失败时列表不完整：不报告取消关注，保留旧记录，也不记录版本号，下次重新拉取
+            removed = []
+            current = {**previous, **current}
+        else:
+            removed = [uid for uid in previous if uid not in current]
+        followings_snapshot_cache.set(snapshot_key, {
+            "version": None if failed else version,
+            "users": current,
+            "updated_at": int(time.time())
+        })
+        return {"status": "success", "type": "followings_diff", "data": {
+            "unchanged": False,
+            "initial": snapshot is None,
+            "partial": bool(failed),
+            "version": version,
+            "added": added,
+            "removed": removed,
+            "uids": list(current),
+            "total": len(current)
+        }}
     except Exception as e:
         import traceback
         traceback.print_exc()
         return {"status": "error", "message": str(e)}
 
+async def get_cache_stats():
+    return {"status": "success", "data": {name: cache.stats() for name, cache in CACHES.items()}}
+
+async def get_coalesce_stats():
+    executed = sum(c["executed"] for c in _coalesce_counts.values())
+    coalesced = sum(c["coalesced"] for c in _coalesce_counts.values())
+    return {"status": "success", "data": {
+        "executed": executed,
+        "coalesced": coalesced,
+        "in_flight": len(_inflight),
+        "commands": _coalesce_counts,
+    }}
+
+async def get_response_cache_stats():
+    return {"status": "success", "data": {
+        "enabled": RESPONSE_CACHE_ENABLED,
+        "background_refresh": _response_refresh_in_background,
+        "refreshing": len(_refreshing),
+        "commands": _response_counts,
+    }}
+
+async def get_limiter_stats():
+    return {"status": "success", "data": {
+        "enabled": RATE_LIMIT_ENABLED,
+        "limiters": {limiter.key: limiter.stats() for limiter in _limiters.values()},
+    }}
+
 # Command dispatcher
+# 命令名 -> 处理协程，位置参数与命令行参数一一对应：command [arg1] [group_id]
+COMMANDS = {
+    "video": get_video_info,
+    "bangumi": get_bangumi_info,
+    "article": get_article_info,
+    "live_room": get_live_room_info,
+    "login_url": get_login_url,
+    "login_check": poll_login,
+    "user_dynamic": get_user_dynamic,
+    "user_dynamic_batch": get_user_dynamic_batch,
+    "feed_poll": get_feed_poll,
+    "user_live": get_user_live,
+    "live_status_batch": get_live_status_batch,
+    "dynamic_detail": get_dynamic_detail,
+    "opus": get_opus_detail,
+    "ep": get_ep_info,
+    "media": get_media_info,
+    "user_info": get_user_info,
+    "user_card": get_user_card,
+    "my_followings": get_my_followings,
+    "followings_diff": get_followings_diff,
+    "cache_stats": get_cache_stats,
+    "coalesce_stats": get_coalesce_stats,
+    "response_cache_stats": get_response_cache_stats,
+    "limiter_stats": get_limiter_stats,
+    "image_palette": get_image_palette,
+}
+
+# 结果投影：只保留渲染端实际读取的字段，减少经管道传输与 Node 端解析的数据量
+# 规格为嵌套 dict：True 保留整个值，dict 继续向下投影，"*" 匹配任意键；列表对每个元素应用同一规格
+_DYNAMIC_MODULES_SPEC = {
+    "module_author": True,
+    "module_dynamic": True,
+    "module_stat": True,
+    "module_interaction": {"vote": True, "vote_info": True},
+}
+_DYNAMIC_ORIG_SPEC = {
+    "id_str": True,
+    "type": True,
+    "modules": _DYNAMIC_MODULES_SPEC,
+    "item": {"id_str": True, "type": True, "modules": _DYNAMIC_MODULES_SPEC},
+}
+_DYNAMIC_ITEM_SPEC = {
+    "id": True,
+    "id_str": True,
+    "type": True,
+    "pub_ts": True,
+    "unchanged": True,
+    "author": True,
+    "modules": _DYNAMIC_MODULES_SPEC,
+    "orig": _DYNAMIC_ORIG_SPEC,
+}
+_RESULT_SPEC = {"status": True, "message": True, "type": True}
+
+RENDER_PROFILES_BY_TYPE = {
+    "dynamic": {**_RESULT_SPEC, "data": {**_DYNAMIC_ITEM_SPEC, "item": _DYNAMIC_ITEM_SPEC}},
+    "article": {**_RESULT_SPEC, "data": {
+        "id": True, "mid": True, "title": True, "author_name": True, "author_face": True,
+        "publish_time": True, "summary": True, "html_content": True, "stats": True, "focus": True,
+    }},
+}
+RENDER_PROFILES_BY_COMMAND = {
+    "user_dynamic": {**_RESULT_SPEC, "data": {**_DYNAMIC_ITEM_SPEC, "items": _DYNAMIC_ITEM_SPEC}},
+    "feed_poll": {**_RESULT_SPEC, "data": {"unchanged": True, "initialized": True, "count": True, "authors": {"*": _DYNAMIC_ITEM_SPEC}}},
+}
+# 流式输出的逐条结果
+RENDER_ITEM_PROFILES = {
+    "user_dynamic_batch": {"uid": True, "result": RENDER_PROFILES_BY_COMMAND["user_dynamic"]},
+}
+
+def _project(value, spec):
+    if spec is True:
+        return value
+    if isinstance(value, list):
+        return [_project(v, spec) for v in value]
+    if not isinstance(value, dict):
+        return value
+    wildcard = spec.get('*')
+    out = {}
+    for key, sub in value.items():
+        sub_spec = spec.get(key, wildcard)
+        if sub_spec:
+            out[key] = _project(sub, sub_spec)
+    return out
+
+def _fields_spec(fields):
+    # "data.id,data.modules.module_author" -> 嵌套规格，始终保留 status/message/type
+    spec = dict(_RESULT_SPEC)
+    for path in str(fields).split(','):
+        parts = [p for p in path.strip().split('.') if p]
+        if not parts:
+            continue
+        node = spec
+        for part in parts[:-1]:
+            if node.get(part) is True:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = True
+    return spec
+
+def _projection_for(command, result, fields):
+    if not fields:
+        return None
+    if fields == 'render':
+        if isinstance(result, dict) and result.get('type') in RENDER_PROFILES_BY_TYPE:
+            return RENDER_PROFILES_BY_TYPE[result['type']]
+        return RENDER_PROFILES_BY_COMMAND.get(command)
+    return _fields_spec(fields)
+
+# 单飞合并：命令 + 规范化后的 ID + 凭据文件相同的并发请求共享同一个执行任务，
+# 结果（包括异常）返回给所有等待方。只用于无副作用、不流式输出的查询命令
+COALESCE_COMMANDS = {
+    "video", "bangumi", "article", "live_room", "user_dynamic", "user_live", "dynamic_detail",
+    "opus", "ep", "media", "user_info", "user_card", "image_palette",
+}
+_ID_PREFIX_RE = re.compile(r'(?i)^(av|bv|cv|ep|ss|md)(\w+)$')
+_inflight = {}
+_coalesce_counts = {}  # command -> {"executed", "coalesced"}
+
+def _normalize_id(value):
+    text = str(value).strip().split('?')[0].split('#')[0].rstrip('/')
+    match = _ID_PREFIX_RE.match(text)
+    if match:
+        prefix = match.group(1).lower()
+        # BV 号区分大小写，只统一前缀
+        text = prefix + (match.group(2) if prefix == 'bv' else match.group(2).lower())
+    return text
+
+def _coalesce_key(command, args):
+    if command not in COALESCE_COMMANDS or not args:
+        return None
+    group_id = args[1] if len(args) > 1 else None
+    return (command, _normalize_id(args[0]), get_credential_file(group_id or None)) + tuple(str(a) for a in args[2:])
+
+async def _run_coalesced(command, handler, args):
+    key = _coalesce_key(command, args)
+    if key is None:
+        return await handler(*args)
+    counts = _coalesce_counts.setdefault(command, {"executed": 0, "coalesced": 0})
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(handler(*args))
+        _inflight[key] = task
+
+        def release(done, key=key):
+            if _inflight.get(key) is done:
+                del _inflight[key]
+
+        task.add_done_callback(release)
+        counts["executed"] += 1
+    else:
+        counts["coalesced"] += 1
+    # 某个等待方被取消时不影响共享任务
+    return await asyncio.shield(task)
+
+# 响应缓存：按命令设置 (新鲜期, 最长保留期)，单位秒。新鲜期内直接返回缓存；
+# 超过新鲜期但仍在保留期内的条目为“陈旧”条目：常驻模式下先返回旧结果并在后台刷新，
+# 单次调用模式下进程随即退出，改为同步刷新，刷新失败（如风控冷却）时返回旧结果
+RESPONSE_CACHE_ENABLED = os.environ.get('BILI_RESPONSE_CACHE', '1') != '0'
+RESPONSE_CACHE_POLICIES = {
+    "live_room": (30, 600),
+    "video": (600, 24 * 3600),
+    "dynamic_detail": (600, 24 * 3600),
+    "user_info": (1800, 24 * 3600),
+    "user_card": (1800, 24 * 3600),
+    "article": (3600, 7 * 24 * 3600),
+    "opus": (3600, 7 * 24 * 3600),
+}
+# bangumi / ep / media 不做整条结果缓存，由季度缓存分别按概览与播放统计的 TTL 复用
+# 可在参数末尾指定本次可接受的最长缓存时间（秒）的命令 -> 该参数的位置。该参数不参与缓存键，也不传给处理函数；
+# 超过它的条目不会作为陈旧结果返回，而是同步刷新（如开播通知需要最新的标题、封面和直播状态）
+RESPONSE_MAX_AGE_ARGS = {"live_room": 2}
+_response_caches = {}
+_response_counts = {}  # command -> {"fresh", "stale", "forced", "miss", "refreshed", "refresh_failed"}
+_response_refresh_in_background = False
+_refreshing = {}  # cache key -> 后台刷新任务
+
+def _response_cache(command):
+    cache = _response_caches.get(command)
+    if cache is None:
+        cache = TwoTierCache(f'response_{command}', ttl=RESPONSE_CACHE_POLICIES[command][1], max_memory=512, max_disk=20000)
+        _response_caches[command] = cache
+    return cache
+
+async def _fetch_and_store(command, handler, args, cache, cache_key):
+    result = await _run_coalesced(command, handler, args)
+    if isinstance(result, dict) and result.get("status") == "success":
+        cache.set(cache_key, result)
+    return result
+
+def _schedule_refresh(command, handler, args, cache, cache_key, counts):
+    if cache_key in _refreshing:
+        return
+
+    async def refresh():
+        try:
+            result = await _fetch_and_store(command, handler, args, cache, cache_key)
+            ok = isinstance(result, dict) and result.get("status") == "success"
+        except Exception:
+            ok = False
+        counts["refreshed" if ok else "refresh_failed"] += 1
+
+    task = asyncio.ensure_future(refresh())
+    _refreshing[cache_key] = task
+    task.add_done_callback(lambda done: _refreshing.pop(cache_key, None))
+
+async def _run_cached(command, handler, args):
+    max_age = None
+    index = RESPONSE_MAX_AGE_ARGS.get(command)
+    if index is not None and len(args) > index:
+        max_age = int(args[index]) if args[index] not in (None, '') else None
+        args = args[:index]
+
+    policy = RESPONSE_CACHE_POLICIES.get(command) if RESPONSE_CACHE_ENABLED else None
+    key = _coalesce_key(command, args) if policy else None
+    if key is None:
+        return await _run_coalesced(command, handler, args)
+
+    cache = _response_cache(command)
+    cache_key = json.dumps(key, ensure_ascii=False)
+    counts = _response_counts.setdefault(command, {
+        "fresh": 0, "stale": 0, "forced": 0, "miss": 0, "refreshed": 0, "refresh_failed": 0,
+    })
+    entry = cache.get_entry(cache_key)
+    if entry is None:
+        counts["miss"] += 1
+        return await _fetch_and_store(command, handler, args, cache, cache_key)
+
+    value, stored_at = entry
+    age = time.time() - stored_at
+    if age < policy[0]:
+        if max_age is None or age < max_age:
+            counts["fresh"] += 1
+            return value
+        # 条目仍在新鲜期内，只是调用方要求更新的结果：单独计数，不算作陈旧命中
+        counts["forced"] += 1
+        return await _fetch_and_store(command, handler, args, cache, cache_key)
+
+    counts["stale"] += 1
+    if max_age is not None:
+        # 调用方不接受旧结果：同步刷新，失败时直接返回错误
+        return await _fetch_and_store(command, handler, args, cache, cache_key)
+    if _response_refresh_in_background:
+        _schedule_refresh(command, handler, args, cache, cache_key, counts)
+        return value
+
+    try:
+        result = await _fetch_and_store(command, handler, args, cache, cache_key)
+    except Exception:
+        result = None
+    if isinstance(result, dict) and result.get("status") == "success":
+        counts["refreshed"] += 1
+        return result
+    counts["refresh_failed"] += 1
+    return value
+
+async def run_command(command, args, fields=None):
+    """
+    执行命令。fields 为 "render"（按渲染端需要的字段裁剪）或逗号分隔的字段路径，为空时返回完整结果。
+    """
+    handler = COMMANDS.get(command)
+    if handler is None:
+        return {"status": "error", "message": "Unknown command"}
+
+    args = list(args)
+    if command in ("my_followings", "followings_diff") and args and args[0] in ("None", ""):
+        args[0] = None
+
+    token = None
+    item_spec = RENDER_ITEM_PROFILES.get(command) if fields == 'render' else None
+    emit = _stream_emit.get()
+    if item_spec and emit is not None:
+        async def projected_emit(item):
+            await emit(_project(item, item_spec))
+        token = _stream_emit.set(projected_emit)
+
+    notice = {}
+    notice_token = _rate_limit_notice.set(notice)
+    try:
+        result = await _run_cached(command, handler, args)
+    except TypeError as e:
+        return {"status": "error", "message": f"Invalid arguments for {command}: {str(e)}"}
+    except Exception as e:
+        result = {"status": "error", "message": str(e)}
+    finally:
+        _rate_limit_notice.reset(notice_token)
+        if token is not None:
+            _stream_emit.reset(token)
+
+    # 失败且期间触发了风控冷却时，告知调用方何时再试，而不是立即重试
+    if notice and isinstance(result, dict) and result.get("status") == "error":
+        result["rate_limited"] = True
+        result["retry_after"] = int(notice["retry_after"]) + 1
+
+    spec = _projection_for(command, result, fields)
+    return _project(result, spec) if spec else result
+
+def _dumps(obj):
+    # 紧凑输出；有 orjson 时优先使用，遇到其不支持的值（如超过 64 位的整数）时退回标准库
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _encode_line(obj):
+    return _dumps(obj) + b"\n"
+
+async def _serve_stream(reader, write):
+    """
+    常驻模式的请求循环：每行一个 JSON 请求 {"id", "command", "args", "fields"?}，
+    每个请求独立调度，完成后立即按行写回 {"id", "result"}，响应顺序不保证与请求一致。
+    """
+    pending = set()
+
+    async def handle(req_id, command, args, fields):
+        async def emit(item):
+            await write(_encode_line({"id": req_id, "item": item}))
+
+        _stream_emit.set(emit)
+        try:
+            result = await run_command(command, args, fields)
+        except Exception as e:
+            result = {"status": "error", "message": str(e)}
+        await write(_encode_line({"id": req_id, "result": result}))
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+            req_id = req.get('id')
+            command = req['command']
+            args = req.get('args') or []
+            fields = req.get('fields')
+        except Exception as e:
+            await write(_encode_line({"id": None, "result": {"status": "error", "message": f"Invalid request: {str(e)}"}}))
+            continue
+
+        task = asyncio.create_task(handle(req_id, command, args, fields))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    # 输入关闭后等待剩余请求完成再退出
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+def _start_background_tasks():
+    # 仅常驻模式启用的后台任务
+    tasks = []
+    if AUTHOR_PROFILE_REFRESH_INTERVAL > 0:
+        tasks.append(asyncio.ensure_future(refresh_author_profiles()))
+    return tasks
+
+def _stop_background_tasks(tasks):
+    for task in tasks:
+        task.cancel()
+
+async def serve(socket_path=None):
+    global _response_refresh_in_background
+    loop = asyncio.get_running_loop()
+    # 常驻进程只启动一次：预先导入全部依赖并创建共享会话（bilibili_api 的请求也走同一个连接池）
+    preload_modules()
+    get_http_session()
+    # 常驻进程可以在返回陈旧缓存后继续完成后台刷新
+    _response_refresh_in_background = True
+    background = _start_background_tasks()
+
+    if socket_path:
+        async def on_connection(reader, writer):
+            lock = asyncio.Lock()
+
+            async def write(data):
+                async with lock:
+                    writer.write(data)
+                    await writer.drain()
+
+            try:
+                await _serve_stream(reader, write)
+            finally:
+                writer.close()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(on_connection, path=socket_path, limit=STREAM_LIMIT)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            _stop_background_tasks(background)
+            flush_rate_limiters()
+            await close_http_session()
+        return
+
+    # stdin/stdout 模式：协议独占 stdout，其余 print 输出重定向到 stderr
+    out = sys.stdout.buffer
+    sys.stdout = sys.stderr
+
+    reader = asyncio.StreamReader(limit=STREAM_LIMIT)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+
+    async def write(data):
+        out.write(data)
+        out.flush()
+
+    try:
+        await _serve_stream(reader, write)
+    finally:
+        _stop_background_tasks(background)
+        flush_rate_limiters()
+        await close_http_session()
+
 async def main():
     if len(sys.argv) < 2:
         print(json.dumps({"status": "error", "message": "No command provided"}))
         return
 
     command = sys.argv[1]
-    
-    # Helper to get optional group_id from the last argument
-    # We assume standard call is: python script.py command [arg1] [group_id]
-    # or python script.py command [arg1] [arg2] [group_id]
-    
-    if command == "video":
-        bvid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_video_info(bvid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "bangumi":
-        season_id = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_bangumi_info(season_id, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "article":
-        cvid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_article_info(cvid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "live_room":
-        room_id = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_live_room_info(room_id, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "login_url":
-        result = await get_login_url()
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "login_check":
-        key = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await poll_login(key, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "user_dynamic":
-        uid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_user_dynamic(uid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "user_live":
-        uid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_user_live(uid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-        
-    elif command == "dynamic_detail":
-        did = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_dynamic_detail(did, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "opus":
-        did = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_opus_detail(did, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "ep":
-        ep_id = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_ep_info(ep_id, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "media":
-        media_id = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_media_info(media_id, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "user_info":
-        uid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_user_info(uid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "user_card":
-        uid = sys.argv[2]
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_user_card(uid, group_id)
-        print(json.dumps(result, ensure_ascii=False))
-
-    elif command == "my_followings":
-        group_name = None
-        if len(sys.argv) > 2:
-            group_name = sys.argv[2]
-            if group_name == "None" or group_name == "":
-                group_name = None
-        group_id = sys.argv[3] if len(sys.argv) > 3 else None
-        result = await get_my_followings(group_name, group_id)
-        print(json.dumps(result, ensure_ascii=False))
 
-    else:
-        print(json.dumps({"status": "error", "message": "Unknown command"}))
+    if command == "serve":
+        # python script.py serve [--socket /path/to/sock]
+        socket_path = None
+        if '--socket' in sys.argv:
+            idx = sys.argv.index('--socket')
+            socket_path = sys.argv[idx + 1] if len(sys.argv) > idx + 1 else None
+        await serve(socket_path)
+        return
+
+    # 单次调用模式：python script.py command [arg1] [group_id] [--fields=render]
+    # 批量命令的逐条结果先按行输出，最后一行为命令的最终结果
+    out = sys.stdout.buffer
+
+    async def emit(item):
+        sys.stdout.flush()
+        out.write(_encode_line(item))
+        out.flush()
+
+    fields = None
+    args = []
+    for arg in sys.argv[2:]:
+        if arg.startswith('--fields='):
+            fields = arg[len('--fields='):]
+        else:
+            args.append(arg)
+
+    _stream_emit.set(emit)
+    try:
+        result = await run_command(command, args, fields)
+    finally:
+        flush_rate_limiters()
+        await close_http_session()
+    sys.stdout.flush()
+    out.write(_encode_line(result))
+    out.flush()
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -275,6 +275,49 @@ class SubscriptionService {
         this.refreshCookieFollowings().catch(e => logger.error('\[SubscriptionService\] Error in refreshCookieFollowings:', e));
     }
 
+    /**
+     * 通过 followings_diff 增量更新某个分组的关注列表
+     * @returns {Promise<boolean>} 是否已成功应用（失败时调用方回退为全量拉取）
+     */
+    async applyFollowingsDiff(groupName, groupId, tag, mergeUser) {
+        try {
+            const res = await biliApi.getFollowingsDiff(groupName, groupId);
+            if (res.status !== 'success' || !res.data) return false;
+            const { added = [], removed = [], uids = [], total } = res.data;
+
+            // 快照按凭据与分组保存，保留的用户以快照返回的 uids 为准；
+            // cookieFollowings 由多个群共享，只用来查找用户资料（与所属分组无关）
+            const known = new Map((this.cookieFollowings || []).map(f => [String(f.uid), f]));
+            const addedSet = new Set(added.map(u => String(u.uid)));
+            const kept = [];
+            let missing = 0;
+            for (const uid of uids.map(String)) {
+                if (addedSet.has(uid)) continue;
+                const f = known.get(uid);
+                if (f) kept.push(f);
+                else missing++;
+            }
+
+            // 本地记录缺少快照中的用户（例如本地文件被清空）时回退为全量拉取
+            if (missing > 0) {
+                logger.info(`[SubscriptionService] Followings snapshot out of sync for QQ Group ${groupId} (${missing} of ${total} users missing locally), doing full fetch`);
+                return false;
+            }
+
+            for (const f of kept) {
+                mergeUser({ uid: f.uid, name: f.name, face: f.face, level: f.level, sign: f.sign }, tag);
+            }
+            for (const u of added) {
+                mergeUser(u, tag);
+            }
+            logger.info(`[SubscriptionService] Followings for QQ Group ${groupId}: ${res.data.unchanged ? 'unchanged' : `+${added.length} -${removed.length}`}, total ${total}`);
+            return true;
+        } catch (e) {
+            logger.warn(`[SubscriptionService] Followings diff failed for QQ Group ${groupId}: ${e.message}`);
+            return false;
+        }
+    }
+
     async refreshCookieFollowings() {
         logger.info('[SubscriptionService] Refreshing cookie followings...');
         try {
@@ -308,15 +351,26 @@ class SubscriptionService {
                     
                     logger.info(`[SubscriptionService] Fetching followings for QQ Group ${groupId} (BiliGroup: ${groupName || 'ALL'})...`);
                     
+                    const tag = groupName || 'ALL';
+                    // 优先按增量同步：在上次的列表上应用新增/取消关注
+                    if (await this.applyFollowingsDiff(groupName, groupId, tag, mergeUser)) {
+                        continue;
+                    }
+
                     // Call API with groupId to use that group's cookie
-                    const res = await biliApi.getMyFollowings(groupName, groupId);
+                    // 关注列表逐条流式返回，边接收边合并
+                    const res = await biliApi.getMyFollowings(groupName, groupId, (u) => mergeUser(u, tag));
                     
-                    if (res.status === 'success' && res.data) {
-                        const tag = groupName || 'ALL';
-                        for (const u of res.data) {
-                            mergeUser(u, tag);
+                    if (res.status === 'success' && res.data && res.data.partial) {
+                        // 部分分页失败时列表不完整：保留该分组原有的记录，避免把未取到的用户当作已取消关注
+                        for (const old of this.cookieFollowings || []) {
+                            if ((old.biliGroups || []).includes(tag)) {
+                                mergeUser({ uid: old.uid, name: old.name, face: old.face, level: old.level, sign: old.sign }, tag);
+                            }
                         }
-                        logger.info(`[SubscriptionService] Fetched ${res.data.length} users for QQ Group ${groupId}`);
+                        logger.warn(`[SubscriptionService] Fetched ${res.data.count} of ${res.data.total} users for QQ Group ${groupId} (pages ${res.data.failed.join(', ')} failed), keeping previous entries`);
+                    } else if (res.status === 'success' && res.data) {
+                        logger.info(`[SubscriptionService] Fetched ${res.data.count} users for QQ Group ${groupId}`);
                     } else {
                         logger.warn(`[SubscriptionService] Failed to fetch followings for QQ Group ${groupId}: ${res.message}`);
                     }
@@ -437,12 +491,28 @@ class SubscriptionService {
 
         // 用户订阅：并发检查动态与直播（优化版）
         const BATCH_SIZE = 6; // 减少批次大小以降低API压力（从10降至6）
-        const BATCH_DELAY = 1500; // 批次间延迟1.5秒，避免触发速率限制
+        // 常驻进程运行时 Python 端按凭据与接口自适应限流，无需固定延迟；
+        // 单次调用（未启用常驻模式或常驻进程不可用而降级）时各进程之间不共享令牌桶，仍保留批次间延迟。
+        // 是否延迟在每个批次结束时按常驻进程的实际状态决定
+        const BATCH_DELAY = 1500;
         const MAX_RETRIES = 1; // 失败后最多重试1次
 
         let successCount = 0;
         let failCount = 0;
 
+        // 先通过一次批量调用获取所有 UP 的最新动态（Python 侧并发执行，逐条返回），
+        // 批量调用失败时各用户回退为单独调用
+        // 开启 Cookie 同步时，账号关注的 UP 通过关注动态流检测新动态，只有其余 UID 逐个轮询
+        const feedDynamics = await this.pollFollowingFeeds(effectiveUserSubs);
+        const prefetchedDynamics = await this.prefetchUserDynamics(
+            effectiveUserSubs.filter(sub => !feedDynamics.has(String(sub.uid)))
+        );
+        for (const [uid, result] of feedDynamics) {
+            prefetchedDynamics.set(uid, result);
+        }
+        // 直播状态同样一次批量查询，失败的 UID 回退为单独查询
+        const prefetchedLive = await this.prefetchLiveStatus(effectiveUserSubs);
+
         for (let i = 0; i < effectiveUserSubs.length; i += BATCH_SIZE) {
             const batch = effectiveUserSubs.slice(i, i + BATCH_SIZE);
             const batchNum = Math.floor(i / BATCH_SIZE) + 1;
@@ -460,8 +530,10 @@ class SubscriptionService {
                 // 重试循环
                 for (let attempt = 0; attempt <= MAX_RETRIES; attempt++) {
                     try {
-                        await this.checkUserDynamic(sub);
-                        await this.checkUserLive(sub);
+                        // 重试时不再使用预取结果，重新单独请求
+                        const prefetched = attempt === 0 ? prefetchedDynamics.get(String(sub.uid)) : null;
+                        await this.checkUserDynamic(sub, false, prefetched);
+                        await this.checkUserLive(sub, attempt === 0 ? prefetchedLive.get(String(sub.uid)) : null);
                         // Update state
                         this.updateSubState(sub);
                         return { success: true, uid: sub.uid };
@@ -492,7 +564,7 @@ class SubscriptionService {
             });
 
             // 批次间延迟（最后一个批次不需要延迟）
-            if (i + BATCH_SIZE < effectiveUserSubs.length) {
+            if (!biliApi.daemonAlive() && i + BATCH_SIZE < effectiveUserSubs.length) {
                 await new Promise(r => setTimeout(r, BATCH_DELAY));
             }
         }
@@ -516,6 +588,112 @@ class SubscriptionService {
         logger.info(`[SubscriptionService] Check cycle finished in ${duration.toFixed(2)}s. Success: ${successCount}, Failed: ${failCount}`);
     }
     
+    /**
+     * 批量获取用户最新动态
+     * @param {Array} subs - 用户订阅列表
+     * @returns {Promise<Map>} uid -> user_dynamic 结果
+     */
+    async prefetchUserDynamics(subs) {
+        const results = new Map();
+        if (subs.length === 0) return results;
+
+        const items = subs.map(sub => ({
+            uid: String(sub.uid),
+            group_id: sub.groupIds.length > 0 ? sub.groupIds[0] : null,
+            last_id: sub.lastDynamicId || null,
+            last_ts: sub.lastDynamicId ? (sub.lastDynamicTime || null) : null
+        }));
+
+        try {
+            const res = await biliApi.getUserDynamicBatch(items, (item) => {
+                if (item && item.uid && item.result && item.result.status === 'success') {
+                    results.set(String(item.uid), item.result);
+                }
+            });
+            if (res && res.data) {
+                logger.info(`[SubscriptionService] Batch dynamic prefetch finished: ${results.size}/${items.length} succeeded, ${res.data.errors || 0} error(s)`);
+            }
+        } catch (e) {
+            logger.warn(`[SubscriptionService] Batch dynamic prefetch failed, falling back to per-user requests: ${e.message}`);
+        }
+        return results;
+    }
+
+    /**
+     * 通过开启 Cookie 同步的群的凭据轮询关注动态流
+     * @param {Array} subs - 用户订阅列表
+     * @returns {Promise<Map>} uid -> user_dynamic 格式的结果，仅包含动态流覆盖的 UID
+     */
+    async pollFollowingFeeds(subs) {
+        const results = new Map();
+        const syncGroups = Object.keys(config.groupConfigs).filter(gid => config.getGroupConfig(gid, 'enableCookieSync'));
+        if (syncGroups.length === 0 || this.cookieFollowings.length === 0) return results;
+
+        const authors = new Map(); // mid -> [dynamic]，从旧到新
+        for (const groupId of syncGroups) {
+            try {
+                const res = await biliApi.feedPoll(groupId);
+                // 首次轮询只建立基线；新动态超过翻页上限时动态流不完整（基线未推进），本轮都改为逐个检查
+                if (res.status !== 'success' || !res.data || res.data.initialized || res.data.truncated) {
+                    const reason = res.message || (res.data && res.data.truncated ? 'too many new dynamics, feed truncated' : 'baseline initialized');
+                    logger.info(`[SubscriptionService] Following feed not usable for QQ Group ${groupId} this cycle: ${reason}`);
+                    return new Map();
+                }
+                for (const [mid, items] of Object.entries(res.data.authors || {})) {
+                    const list = authors.get(String(mid)) || [];
+                    for (const item of items) {
+                        if (!list.some(existing => existing.id === item.id)) list.push(item);
+                    }
+                    list.sort((a, b) => (a.pub_ts || 0) - (b.pub_ts || 0));
+                    authors.set(String(mid), list);
+                }
+            } catch (e) {
+                logger.warn(`[SubscriptionService] Following feed poll failed for QQ Group ${groupId}: ${e.message}`);
+                return new Map();
+            }
+        }
+
+        const followed = new Set(this.cookieFollowings.map(f => String(f.uid)));
+        for (const sub of subs) {
+            const uid = String(sub.uid);
+            // 首次检查的 UID 需要通过单独请求记录初始状态
+            if (!followed.has(uid) || !sub.lastDynamicId) continue;
+            const items = (authors.get(uid) || []).filter(item => (item.pub_ts || 0) > (sub.lastDynamicTime || 0));
+            if (items.length > 0) {
+                results.set(uid, { status: 'success', data: { ...items[items.length - 1], items } });
+            } else {
+                results.set(uid, { status: 'success', data: { id: sub.lastDynamicId, pub_ts: sub.lastDynamicTime, unchanged: true } });
+            }
+        }
+        logger.info(`[SubscriptionService] Following feed covered ${results.size}/${subs.length} users, ${authors.size} author(s) with new dynamics`);
+        return results;
+    }
+
+    /**
+     * 批量获取用户直播状态
+     * @param {Array} subs - 用户订阅列表
+     * @returns {Promise<Map>} uid -> { room_id, live_status, title }
+     */
+    async prefetchLiveStatus(subs) {
+        const results = new Map();
+        if (subs.length === 0) return results;
+
+        try {
+            const res = await biliApi.getLiveStatusBatch(subs.map(sub => sub.uid));
+            if (res.status === 'success' && res.data && res.data.rooms) {
+                for (const [uid, room] of Object.entries(res.data.rooms)) {
+                    results.set(String(uid), room);
+                }
+                logger.info(`[SubscriptionService] Batch live status finished: ${results.size}/${subs.length} in ${res.data.requests} request(s)`);
+            } else {
+                logger.warn(`[SubscriptionService] Batch live status failed: ${res.message || 'N/A'}`);
+            }
+        } catch (e) {
+            logger.warn(`[SubscriptionService] Batch live status failed, falling back to per-user requests: ${e.message}`);
+        }
+        return results;
+    }
+
     // Helper to update state after check
     updateSubState(sub) {
         // 1. Try to find in persistent storage
@@ -604,12 +782,15 @@ class SubscriptionService {
         return Array.from(subMap.values());
     }
 
-    async checkUserDynamic(sub, force = false) {
+    async checkUserDynamic(sub, force = false, prefetched = null) {
         logger.info(`[CheckDynamic] Checking dynamic for UID: ${sub.uid}, Force: ${force}`);
         try {
             // Try to use the first group's credential
             const groupId = sub.groupIds.length > 0 ? sub.groupIds[0] : null;
-            const res = await biliApi.getUserDynamic(sub.uid, groupId);
+            // 优先使用批量预取的结果；非强制检查时带上游标，没有新动态时接口只返回精简结果
+            const res = prefetched || (force
+                ? await biliApi.getUserDynamic(sub.uid, groupId)
+                : await biliApi.getUserDynamic(sub.uid, groupId, sub.lastDynamicId, sub.lastDynamicTime));
             logger.info(`[CheckDynamic] API response status: ${res.status}`);
 
             if (res.status === 'success' && res.data) {
@@ -620,12 +801,12 @@ class SubscriptionService {
 
                 // 过滤掉自动发布的直播推荐动态 (DYNAMIC_TYPE_LIVE_RCMD 或 MAJOR_TYPE_LIVE_RCMD)
                 // 这种动态通常在开始直播时自动发送，我们使用 checkUserLive 单独处理直播通知，避免重复
-                const isLiveDynamic = dynamicType === 'DYNAMIC_TYPE_LIVE_RCMD' || 
-                    (res.data.modules && res.data.modules.module_dynamic && 
-                     res.data.modules.module_dynamic.major && 
-                     res.data.modules.module_dynamic.major.type === 'MAJOR_TYPE_LIVE_RCMD');
+                // 带游标请求时，data.items 按时间从旧到新列出自上次检查以来的全部新动态
+                const newItems = (!force && Array.isArray(res.data.items) && res.data.items.length > 0)
+                    ? res.data.items.filter(item => !this.isLiveDynamic(item))
+                    : null;
 
-                if (isLiveDynamic) {
+                if (this.isLiveDynamic(res.data) && !(newItems && newItems.length > 0)) {
                     logger.info(`[CheckDynamic] Skipping LIVE_RCMD dynamic ${dynamicId} to avoid duplicate notification.`);
                     // 仍然更新状态，以免下次检查时被视为新动态（虽然 checkUserLive 会处理，但为了状态一致性）
                     if (!force && dynamicTime > (sub.lastDynamicTime || 0)) {
@@ -648,29 +829,28 @@ class SubscriptionService {
                         // 这样可以防止：UP主删了最新动态，获取到的是旧动态（时间较早），从而避免重复推送旧动态
                         // force 模式下忽略时间检查
                         if (dynamicTime > sub.lastDynamicTime || force) {
-                            logger.info(`[CheckDynamic] New dynamic detected, generating image...`);
-                             // New dynamic found - get dynamic details and generate image
-                            try {
-                                // Optimization: Use the data directly from getUserDynamic since it now contains full modules
-                                const dynamicDetail = {
-                                    status: 'success',
-                                    data: res.data
-                                };
-
-                                if (dynamicDetail.status === 'success') {
-                                    logger.info(`[CheckDynamic] Generating preview card for dynamic ${dynamicId}...`);
-                                    await this.notifyGroupsWithImage(sub.groupIds, dynamicDetail, 'dynamic', `https://t.bilibili.com/${dynamicId}`);
-                                    logger.info(`[CheckDynamic] Notification sent successfully for dynamic ${dynamicId}`);
-                                } else {
-                                    logger.warn(`[CheckDynamic] Dynamic detail status not success, falling back to text`);
-                                    // Fallback to text notification if image generation fails
-                                    this.notifyGroups(sub.groupIds, `动态预览生成失败，已降级为文本链接：\nhttps://t.bilibili.com/${dynamicId}`);
+                            const pushItems = newItems || [res.data];
+                            logger.info(`[CheckDynamic] ${pushItems.length} new dynamic(s) detected, generating image...`);
+                            // 多条新动态按时间从旧到新依次推送
+                            for (const item of pushItems) {
+                                const itemId = item.id;
+                                // New dynamic found - get dynamic details and generate image
+                                try {
+                                    // Optimization: Use the data directly from getUserDynamic since it now contains full modules
+                                    const dynamicDetail = {
+                                        status: 'success',
+                                        data: item
+                                    };
+
+                                    logger.info(`[CheckDynamic] Generating preview card for dynamic ${itemId}...`);
+                                    await this.notifyGroupsWithImage(sub.groupIds, dynamicDetail, 'dynamic', `https://t.bilibili.com/${itemId}`);
+                                    logger.info(`[CheckDynamic] Notification sent successfully for dynamic ${itemId}`);
+                                } catch (e) {
+                                    logger.error(`[CheckDynamic] Error generating/sending image for dynamic ${itemId}:`, e);
+                                    logger.error(`[CheckDynamic] Error stack:`, e.stack);
+                                    // Fallback to text notification
+                                    this.notifyGroups(sub.groupIds, `动态预览生成失败，已降级为文本链接：\nhttps://t.bilibili.com/${itemId}`);
                                 }
-                            } catch (e) {
-                                logger.error(`[CheckDynamic] Error generating/sending image for dynamic ${dynamicId}:`, e);
-                                logger.error(`[CheckDynamic] Error stack:`, e.stack);
-                                // Fallback to text notification
-                                this.notifyGroups(sub.groupIds, `动态预览生成失败，已降级为文本链接：\nhttps://t.bilibili.com/${dynamicId}`);
                             }
                         } else {
                             logger.info(`[CheckDynamic] Ignored old dynamic for ${sub.uid}: ID=${dynamicId}, Time=${dynamicTime} <= LastTime=${sub.lastDynamicTime}`);
@@ -700,6 +880,14 @@ class SubscriptionService {
         }
     }
 
+    // 自动发布的直播推荐动态 (DYNAMIC_TYPE_LIVE_RCMD 或 MAJOR_TYPE_LIVE_RCMD)
+    isLiveDynamic(data) {
+        return data.type === 'DYNAMIC_TYPE_LIVE_RCMD' ||
+            !!(data.modules && data.modules.module_dynamic &&
+               data.modules.module_dynamic.major &&
+               data.modules.module_dynamic.major.type === 'MAJOR_TYPE_LIVE_RCMD');
+    }
+
     async checkSubscriptionNow(uid, groupId) {
         logger.info(`[CheckSubscriptionNow] Received request for UID/DynamicID: ${uid}, GroupID: ${groupId}`);
 
@@ -743,10 +931,13 @@ class SubscriptionService {
         }
     }
 
-    async checkUserLive(sub) {
+    async checkUserLive(sub, prefetched = null) {
         // Try to use the first group's credential
         const groupId = sub.groupIds.length > 0 ? sub.groupIds[0] : null;
-        const res = await biliApi.getUserLive(sub.uid, groupId);
+        // 批量查询结果与 getUserLive 的 live_room 字段一致
+        const res = prefetched
+            ? { status: 'success', data: { live_room: prefetched } }
+            : await biliApi.getUserLive(sub.uid, groupId);
         if (res.status === 'success' && res.data) {
             const isLive = res.data.live_room?.live_status === 1;
             const roomId = res.data.live_room?.room_id;
@@ -761,7 +952,7 @@ class SubscriptionService {
             if (isLive && !wasLive && roomId) {
                 try {
                     // Get live room details and generate image
-                    const liveDetail = await biliApi.getLiveRoomInfo(roomId, groupId);
+                    const liveDetail = await biliApi.getLiveRoomInfo(roomId, groupId, 0);
                     if (liveDetail.status === 'success') {
                         await this.notifyGroupsWithImage(sub.groupIds, liveDetail, 'live', `https://live.bilibili.com/${roomId}`);
                     } else {
@@ -782,7 +973,8 @@ class SubscriptionService {
     async checkBangumi(sub) {
         // Try to use the first group's credential
         const groupId = sub.groupIds.length > 0 ? sub.groupIds[0] : null;
-        const res = await biliApi.getBangumiInfo(sub.seasonId, groupId);
+        // 概览跳过缓存（新剧集只体现在 new_ep 上），播放统计与封面等仍复用季度缓存
+        const res = await biliApi.getBangumiInfo(sub.seasonId, groupId, 0);
         if (res.status === 'success' && res.data) {
             const info = res.data;
             const newEp = info.new_ep || {};